@@ -1,32 +1,261 @@
-from django.contrib import admin
+import hashlib
+from datetime import datetime
 
-from .models import Category, Location, Post
+from django import forms
+from django.conf import settings
+from django.contrib import admin, messages
+from django.contrib.admin import helpers
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.core.cache import cache
+from django.db.models import Count
+from django.db.models.functions import TruncMonth
+from django.template.response import TemplateResponse
+from django.utils import timezone
+from django.utils.dates import MONTHS
+from django.utils.http import urlencode
+from django.utils.text import Truncator
+
+from . import moderation
+from .models import Category, Comment, ImageJob, Location, Post
+from .paginators import CachedCountPaginator
+from .search import get_search_backend
+
+PUBLICATION_MONTHS_KEY = 'blog:admin:publication-months'
+
+
+def get_publication_months():
+    """Число публикаций по месяцам; считается не чаще раза в таймаут."""
+    months = cache.get(PUBLICATION_MONTHS_KEY)
+    if months is None:
+        months = [
+            (row['month'].year, row['month'].month, row['total'])
+            # is_dst: начало месяца может попасть на переход на летнее
+            # время (в Москве до 1992 года — полночь 1 апреля).
+            for row in Post.objects.annotate(
+                month=TruncMonth('pub_date', is_dst=False))
+            .order_by().values('month').annotate(total=Count('pk'))]
+        cache.set(PUBLICATION_MONTHS_KEY, months,
+                  settings.BLOG_ADMIN_DATE_HIERARCHY_TIMEOUT)
+    return months
+
+
+class PubDateListFilter(admin.SimpleListFilter):
+    """Годы и месяцы публикаций из кеша вместо date_hierarchy.
+
+    date_hierarchy на каждый просмотр списка группирует всю таблицу
+    по датам; здесь группировка берётся из кеша, а выбор месяца —
+    обычный диапазон по индексированному pub_date.
+    """
+
+    title = 'дата публикации'
+    parameter_name = 'pub_month'
+
+    def lookups(self, request, model_admin):
+        years = {}
+        for year, month, total in get_publication_months():
+            years.setdefault(year, {})[month] = total
+        selected_year = (self.value() or '')[:4]
+        choices = []
+        for year in sorted(years, reverse=True):
+            total = sum(years[year].values())
+            choices.append((str(year), f'{year} ({total})'))
+            if str(year) != selected_year:
+                continue
+            for month in sorted(years[year], reverse=True):
+                choices.append((
+                    f'{year}-{month:02}',
+                    f'— {MONTHS[month]} {year} ({years[year][month]})'))
+        return choices
+
+    def queryset(self, request, queryset):
+        if not self.value():
+            return queryset
+        try:
+            year, _, month = self.value().partition('-')
+            start = datetime(int(year), int(month or 1), 1)
+            if not month:
+                end = start.replace(year=start.year + 1)
+            elif start.month == 12:
+                end = start.replace(year=start.year + 1, month=1)
+            else:
+                end = start.replace(month=start.month + 1)
+        except ValueError as error:
+            # Включая 9999: у следующего года нет даты.
+            raise IncorrectLookupParameters(error) from error
+        return queryset.filter(
+            pub_date__gte=timezone.make_aware(start, is_dst=False),
+            pub_date__lt=timezone.make_aware(end, is_dst=False))
+
+
+class CachedCountAdminMixin:
+    """Число строк списка из кеша; сбрасывается тегами ``count_tags``."""
+
+    count_tags = ('posts',)
+    show_full_result_count = False
+
+    def get_paginator(self, request, queryset, per_page, orphans=0,
+                      allow_empty_first_page=True):
+        if not settings.BLOG_ADMIN_ESTIMATED_COUNT:
+            return super().get_paginator(
+                request, queryset, per_page, orphans, allow_empty_first_page)
+        params = urlencode(sorted(
+            (name, value) for name, value in request.GET.items()
+            if name not in ('p', 'o')))
+        return CachedCountPaginator(
+            queryset, per_page, orphans, allow_empty_first_page,
+            count_key=(
+                f'admin:{self.model._meta.model_name}:'
+                f'{hashlib.md5(params.encode()).hexdigest()}'),
+            count_tags=self.count_tags)
+
+
+class BulkModerationAdminMixin:
+    """Массовые действия пачками с отчётом о числе строк и времени."""
+
+    bulk_delete_template = 'admin/blog/bulk_delete_confirmation.html'
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        # Стандартное удаление загружает и удаляет объекты по одному.
+        actions.pop('delete_selected', None)
+        return actions
+
+    def report(self, request, verb, result):
+        done, seconds = result
+        self.message_user(
+            request,
+            f'{verb}: {done} за {seconds:.1f} с '
+            f'(пачками по {settings.BLOG_MODERATION_CHUNK_SIZE}).',
+            messages.SUCCESS)
+
+    def confirm_bulk_delete(self, request, queryset):
+        """Страница подтверждения; None, если удаление уже подтверждено."""
+        if request.POST.get('confirm'):
+            return None
+        return TemplateResponse(request, self.bulk_delete_template, {
+            **self.admin_site.each_context(request),
+            'title': 'Подтверждение удаления',
+            'opts': self.model._meta,
+            'count': queryset.count(),
+            'action': request.POST['action'],
+            'selected': request.POST.getlist(helpers.ACTION_CHECKBOX_NAME),
+            'select_across': request.POST.get('select_across', '0'),
+            'action_checkbox_name': helpers.ACTION_CHECKBOX_NAME,
+        })
+
+
+class PostActionForm(helpers.ActionForm):
+    category = forms.SlugField(
+        label='Слаг категории',
+        required=False,
+        help_text='Для действия «Перенести в категорию».')
 
 
 @admin.register(Post)
-class PostAdmin(admin.ModelAdmin):
-    date_hierarchy = 'pub_date'
+class PostAdmin(CachedCountAdminMixin, BulkModerationAdminMixin,
+                admin.ModelAdmin):
     list_display = ['title', 'author', 'pub_date']
-    search_fields = ['title__startswith', 'author__username']
+    list_filter = [PubDateListFilter]
+    list_select_related = ['author']
+    search_fields = ['title']
     ordering = ['-pub_date']
+    action_form = PostActionForm
+    actions = [
+        'publish_posts', 'unpublish_posts', 'move_to_category',
+        'delete_posts']
+
+    def get_search_results(self, request, queryset, search_term):
+        """Поиск по индексу заголовков; ``@имя`` — публикации автора."""
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        if search_term.startswith('@'):
+            return queryset.filter(author__username=search_term[1:]), False
+        return get_search_backend().filter(
+            queryset, search_term, fields=('title',)), False
+
+    @admin.action(description='Опубликовать')
+    def publish_posts(self, request, queryset):
+        self.report(request, 'Опубликовано',
+                    moderation.update_posts(queryset, is_published=True))
+
+    @admin.action(description='Снять с публикации')
+    def unpublish_posts(self, request, queryset):
+        self.report(request, 'Снято с публикации',
+                    moderation.update_posts(queryset, is_published=False))
+
+    @admin.action(description='Перенести в категорию')
+    def move_to_category(self, request, queryset):
+        slug = request.POST.get('category', '').strip()
+        category = Category.objects.filter(slug=slug).first()
+        if category is None:
+            self.message_user(
+                request, f'Категория со слагом «{slug}» не найдена.',
+                messages.ERROR)
+            return
+        self.report(request, f'Перенесено в «{category.title}»',
+                    moderation.update_posts(queryset, category=category))
+
+    @admin.action(description='Удалить вместе с комментариями')
+    def delete_posts(self, request, queryset):
+        response = self.confirm_bulk_delete(request, queryset)
+        if response is not None:
+            return response
+        self.report(request, 'Удалено публикаций',
+                    moderation.delete_posts(queryset))
+
+
+@admin.register(Comment)
+class CommentAdmin(CachedCountAdminMixin, BulkModerationAdminMixin,
+                   admin.ModelAdmin):
+    list_display = ['short_text', 'author', 'post', 'created_at']
+    list_select_related = ['author', 'post']
+    raw_id_fields = ['post', 'author']
+    search_fields = ['=author__username']
+    ordering = ['-id']
+    count_tags = ('comments',)
+    actions = ['delete_comments']
+
+    @admin.display(description='Текст')
+    def short_text(self, obj):
+        return Truncator(obj.text).chars(80)
+
+    @admin.action(description='Удалить')
+    def delete_comments(self, request, queryset):
+        response = self.confirm_bulk_delete(request, queryset)
+        if response is not None:
+            return response
+        self.report(request, 'Удалено комментариев',
+                    moderation.delete_comments(queryset))
+
+
+class PostCountAdminMixin:
+    """Число публикаций одной агрегацией вместо запроса на каждую строку."""
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            post_count=Count('posts'))
+
+    @admin.display(description='Публикаций', ordering='post_count')
+    def post_count(self, obj):
+        return obj.post_count
 
 
 @admin.register(Category)
-class CategoryAdmin(admin.ModelAdmin):
+class CategoryAdmin(PostCountAdminMixin, admin.ModelAdmin):
     list_display = ['title', 'post_count']
     search_fields = ['title__istartswith']
 
-    def post_count(self, name):
-        return Post.objects.filter(category=name).count()
-
 
 @admin.register(Location)
-class LocationAdmin(admin.ModelAdmin):
+class LocationAdmin(PostCountAdminMixin, admin.ModelAdmin):
     search_fields = ['name__startswith']
     list_display = ['name', 'post_count']
 
-    def post_count(self, name):
-        counter = Post.objects.filter(
-            location=name
-        ).count()
-        return counter
+
+@admin.register(ImageJob)
+class ImageJobAdmin(admin.ModelAdmin):
+    list_display = [
+        'image_name', 'status', 'attempts', 'available_at', 'created_at']
+    list_filter = ['status']
+    readonly_fields = ['post', 'image_name', 'attempts', 'last_error']
@@ -0,0 +1,179 @@
+"""Версии кеша по тегам.
+
+Вместо удаления отдельных ключей у каждого тега хранится версия — время
+последнего изменения в наносекундах. Ключи кеша строятся из версий своих
+тегов, поэтому смена версии делает все такие ключи недостижимыми.
+
+Версии должны быть общими для всех процессов приложения, поэтому они
+хранятся в отдельном кеше ``BLOG_TAG_CACHE_ALIAS`` (файлы, БД или
+memcached/Redis, но не память процесса — см. проверку ``blog.E001``).
+Сами страницы могут лежать и в памяти процесса: устаревшая копия в
+другом воркере недостижима, потому что ключ строится из общих версий.
+"""
+import hashlib
+import time
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import caches
+from django.middleware.csrf import get_token
+from django.template.autoreload import get_template_directories
+from django.utils.cache import (
+    get_conditional_response, patch_cache_control, patch_vary_headers)
+from django.utils.http import http_date
+
+TAG_KEY_PREFIX = 'blog:tag:'
+SITE_TAG = 'site'
+
+
+def get_tag_cache():
+    return caches[settings.BLOG_TAG_CACHE_ALIAS]
+
+
+def get_tag_versions(*tags):
+    keys = [f'{TAG_KEY_PREFIX}{tag}' for tag in tags]
+    tag_cache = get_tag_cache()
+    versions = tag_cache.get_many(keys)
+    missing = {key: time.time_ns() for key in keys if key not in versions}
+    if missing:
+        tag_cache.set_many(missing, None)
+        versions.update(missing)
+    return [versions[key] for key in keys]
+
+
+def invalidate_tags(*tags):
+    version = time.time_ns()
+    get_tag_cache().set_many(
+        {f'{TAG_KEY_PREFIX}{tag}': version for tag in tags}, None)
+
+
+def make_key(prefix, tags, *parts):
+    versions = '.'.join(str(version) for version in get_tag_versions(*tags))
+    return ':'.join([prefix, *map(str, parts), versions])
+
+
+@lru_cache(maxsize=None)
+def get_build_version():
+    """Версия сборки: ``BLOG_BUILD_VERSION`` или время правки шаблонов.
+
+    Входит в валидаторы страниц, чтобы после выкладки новых шаблонов
+    браузеры не получали 304 на разметку прошлой версии.
+    """
+    if settings.BLOG_BUILD_VERSION:
+        return settings.BLOG_BUILD_VERSION
+    return str(max(
+        (path.stat().st_mtime_ns
+         for directory in get_template_directories()
+         for path in directory.rglob('*') if path.is_file()),
+        default=0))
+
+
+def post_tags(post_id, category_slug, author_username):
+    """Теги страниц, на которых выводится публикация."""
+    return [
+        'feed',
+        f'post:{post_id}',
+        f'category:{category_slug}',
+        f'profile:{author_username}',
+    ]
+
+
+class PageTagsMixin:
+    """Теги страницы: ``page_cache_tags`` или ``get_page_cache_tags()``.
+
+    По умолчанию страница зависит от любых публикаций и комментариев.
+    """
+
+    page_cache_tags = ('posts', 'comments')
+
+    def get_page_cache_tags(self):
+        return list(self.page_cache_tags)
+
+    def get_page_cache_url(self, request):
+        """URL страницы в ключе кеша и ETag."""
+        return request.get_full_path()
+
+
+class AnonymousPageCacheMixin(PageTagsMixin):
+    """Кеширует страницу целиком для анонимных читателей.
+
+    Ключ строится из полного URL, версии сборки и версий тегов
+    ``get_page_cache_tags()`` и общего тега ``site``; сигналы моделей
+    меняют версии тегов при любой правке, так что устаревшая страница
+    больше не находится в кеше.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        if (request.method not in ('GET', 'HEAD')
+                or request.user.is_authenticated):
+            return super().dispatch(request, *args, **kwargs)
+        page_cache = caches[settings.BLOG_PAGE_CACHE_ALIAS]
+        key = make_key(
+            'blog:page',
+            [SITE_TAG, *self.get_page_cache_tags()],
+            hashlib.md5(
+                self.get_page_cache_url(request).encode()).hexdigest(),
+            get_build_version())
+        response = page_cache.get(key)
+        if response is not None:
+            return response
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code != 200:
+            return response
+
+        def store(response):
+            if not response.cookies and not request.META.get(
+                    'CSRF_COOKIE_USED'):
+                page_cache.set(
+                    key, response, settings.BLOG_PAGE_CACHE_TIMEOUT)
+
+        if hasattr(response, 'add_post_render_callback'):
+            response.add_post_render_callback(store)
+        else:
+            store(response)
+        return response
+
+
+class ConditionalPageMixin(PageTagsMixin):
+    """Отвечает 304 Not Modified, если страница не менялась.
+
+    Валидаторы берутся из тех же версий тегов, что и ключи кеша страниц:
+    ETag — хеш URL, версии сборки, сессии и CSRF-токена (они меняются при
+    входе, а токен вшит в формы страницы) и версий тегов, Last-Modified —
+    время последней смены версии. Запросов к БД и отрисовки шаблонов для
+    304 не требуется. ``Cache-Control: no-cache`` заставляет браузер
+    спрашивать сервер перед каждым показом сохранённой копии.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return super().dispatch(request, *args, **kwargs)
+        versions = get_tag_versions(SITE_TAG, *self.get_page_cache_tags())
+        session = csrf_cookie = None
+        if request.user.is_authenticated:
+            session = request.session.session_key
+            # Выдаёт токен заранее: тот же попадёт в формы и в cookie.
+            get_token(request)
+            csrf_cookie = request.META['CSRF_COOKIE']
+        etag = '"{}"'.format(hashlib.md5(':'.join(map(str, [
+            self.get_page_cache_url(request),
+            get_build_version(),
+            request.user.pk,
+            session,
+            csrf_cookie,
+            versions,
+        ])).encode()).hexdigest())
+        last_modified = max(versions) // 1_000_000_000
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = super().dispatch(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(last_modified)
+            patch_vary_headers(response, ['Cookie'])
+            if request.user.is_authenticated:
+                patch_cache_control(response, no_cache=True, private=True)
+            else:
+                patch_cache_control(response, no_cache=True)
+        return response
@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.core import checks
+
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@checks.register(checks.Tags.caches)
+def check_tag_cache(app_configs, **kwargs):
+    """Версии тегов в памяти процесса не видны другим воркерам."""
+    alias = settings.BLOG_TAG_CACHE_ALIAS
+    backend = settings.CACHES.get(alias, {}).get('BACKEND')
+    if backend not in PROCESS_LOCAL_CACHES:
+        return []
+    message_class = checks.Warning if settings.DEBUG else checks.Error
+    return [message_class(
+        f'Кеш версий тегов «{alias}» хранится в памяти процесса.',
+        hint=(
+            'Правка в одном воркере не сбросит кеш страниц в других. '
+            'Укажите в BLOG_TAG_CACHE_ALIAS файловый кеш, кеш в БД, '
+            'memcached или Redis.'),
+        id='blog.E001',
+    )]
@@ -0,0 +1,149 @@
+"""RSS- и Atom-ленты: общая, по категории и по автору.
+
+Ленты строятся из той же выборки видимых публикаций, что и страницы,
+и кешируются теми же миксинами: анонимный запрос отдаётся из кеша
+страниц, а клиент, который уже получил ленту, — ответом 304 по ETag
+и Last-Modified из версий тегов, без запросов к БД.
+"""
+import copy
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.syndication.views import Feed
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.text import Truncator
+
+from .cache import AnonymousPageCacheMixin, ConditionalPageMixin
+from .models import Category, Post
+
+User = get_user_model()
+
+
+class FeedDispatch(Feed):
+    """Feed с ``dispatch``, как у представлений-классов.
+
+    Экземпляр ленты общий для всех запросов, поэтому запрос и его
+    аргументы сохраняются в копии.
+    """
+
+    def __call__(self, request, *args, **kwargs):
+        feed = copy.copy(self)
+        feed.request, feed.args, feed.kwargs = request, args, kwargs
+        return feed.dispatch(request, *args, **kwargs)
+
+    def dispatch(self, request, *args, **kwargs):
+        return super().__call__(request, *args, **kwargs)
+
+
+class PostFeed(ConditionalPageMixin, AnonymousPageCacheMixin, FeedDispatch):
+    description_words = 60
+
+    def get_page_cache_url(self, request):
+        # Ссылки в ленте абсолютные: схема и домен входят в ключ кеша.
+        return request.build_absolute_uri()
+
+    def get_posts(self, obj):
+        return Post.objects.published().with_card_data()
+
+    def items(self, obj):
+        return self.get_posts(obj).order_by(
+            '-pub_date', '-id')[:settings.BLOG_FEED_ITEMS]
+
+    def item_title(self, item):
+        return item.title
+
+    def item_description(self, item):
+        return Truncator(item.text).words(self.description_words)
+
+    def item_link(self, item):
+        return reverse('blog:post_detail', args=[item.pk])
+
+    def item_pubdate(self, item):
+        return item.pub_date
+
+    def item_updateddate(self, item):
+        return item.updated_at
+
+    def item_author_name(self, item):
+        return item.author.get_full_name() or item.author.username
+
+    def item_author_link(self, item):
+        return self.request.build_absolute_uri(
+            reverse('blog:profile', args=[item.author.username]))
+
+    def item_categories(self, item):
+        return [item.category.title] if item.category else []
+
+
+class LatestPostsFeed(PostFeed):
+    title = 'Блогикум'
+    description = 'Новые публикации'
+
+    page_cache_tags = ('feed',)
+
+    def link(self):
+        return reverse('blog:index')
+
+
+class CategoryPostsFeed(PostFeed):
+
+    def get_object(self, request, category_slug):
+        return get_object_or_404(
+            Category, slug=category_slug, is_published=True)
+
+    def get_posts(self, obj):
+        return super().get_posts(obj).filter(category=obj)
+
+    def title(self, obj):
+        return f'Блогикум: {obj.title}'
+
+    def description(self, obj):
+        return obj.description
+
+    def link(self, obj):
+        return reverse('blog:category_posts', args=[obj.slug])
+
+    def get_page_cache_tags(self):
+        return [f'category:{self.kwargs["category_slug"]}']
+
+
+class AuthorPostsFeed(PostFeed):
+
+    def get_object(self, request, username):
+        return get_object_or_404(User, username=username)
+
+    def get_posts(self, obj):
+        return super().get_posts(obj).filter(author=obj)
+
+    def title(self, obj):
+        return f'Блогикум: {obj.username}'
+
+    def description(self, obj):
+        return f'Публикации пользователя {obj.username}'
+
+    def link(self, obj):
+        return reverse('blog:profile', args=[obj.username])
+
+    def get_page_cache_tags(self):
+        return [f'profile:{self.kwargs["username"]}']
+
+
+class LatestPostsAtomFeed(LatestPostsFeed):
+    feed_type = Atom1Feed
+    subtitle = LatestPostsFeed.description
+
+
+class CategoryPostsAtomFeed(CategoryPostsFeed):
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return self.description(obj)
+
+
+class AuthorPostsAtomFeed(AuthorPostsFeed):
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return self.description(obj)
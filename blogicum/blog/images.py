@@ -0,0 +1,84 @@
+"""Уменьшенные копии изображений публикаций.
+
+Для каждой загруженной картинки сохраняются копии шириной из
+``BLOG_IMAGE_RENDITION_WIDTHS`` (не шире оригинала) и размеры оригинала.
+Если Pillow собран с поддержкой WebP, те же ширины и полный размер
+дополнительно сохраняются в WebP. Описание копий лежит в
+``Post.image_renditions`` и выводится в ``srcset`` и ``<picture>``.
+
+Файлы хранятся по содержимому и могут быть общими у нескольких
+публикаций, поэтому при замене или удалении картинки они не удаляются
+сразу: ненужные файлы убирает команда ``collect_orphan_media``.
+"""
+import posixpath
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps, features
+
+RENDITIONS_DIR = 'renditions'
+
+WEBP_SUPPORTED = features.check('webp')
+
+
+def build_renditions(image):
+    """Создаёт копии картинки и возвращает их описание для image_renditions."""
+    if not image:
+        return {}
+    image.open('rb')
+    try:
+        with Image.open(image) as original:
+            original = ImageOps.exif_transpose(original)
+            width, height = original.size
+            extension = (
+                'png' if original.mode in ('RGBA', 'LA', 'P') else 'jpg')
+            renditions = []
+            webp = []
+            for target in sorted(settings.BLOG_IMAGE_RENDITION_WIDTHS):
+                if target >= width:
+                    continue
+                resized = original.resize(
+                    (target, max(1, round(height * target / width))),
+                    Image.Resampling.LANCZOS)
+                renditions.append(_save_rendition(image, resized, extension))
+                if WEBP_SUPPORTED:
+                    webp.append(_save_rendition(image, resized, 'webp'))
+            if WEBP_SUPPORTED:
+                webp.append(_save_rendition(image, original, 'webp'))
+    finally:
+        image.close()
+    return {
+        'source': image.name,
+        'width': width,
+        'height': height,
+        'renditions': renditions,
+        'webp': webp,
+    }
+
+
+def _save_rendition(image, picture, extension):
+    buffer = BytesIO()
+    if extension == 'jpg':
+        picture.convert('RGB').save(
+            buffer, 'JPEG', quality=settings.BLOG_IMAGE_QUALITY,
+            optimize=True, progressive=True)
+    elif extension == 'webp':
+        picture.save(
+            buffer, 'WEBP', quality=settings.BLOG_IMAGE_WEBP_QUALITY,
+            method=6)
+    else:
+        picture.save(buffer, 'PNG', optimize=True)
+    stem = posixpath.splitext(posixpath.basename(image.name))[0]
+    name = image.storage.save(
+        posixpath.join(
+            image.field.upload_to, RENDITIONS_DIR,
+            f'{stem}_{picture.width}w.{extension}'),
+        ContentFile(buffer.getvalue()))
+    return {'name': name, 'width': picture.width, 'height': picture.height}
+
+
+def rendition_names(data):
+    return {
+        rendition['name']
+        for rendition in (*data.get('renditions', ()), *data.get('webp', ()))}
@@ -0,0 +1,119 @@
+"""Очередь обработки изображений вне цикла запроса.
+
+Сохранение публикации с новой картинкой только ставит задачу
+``ImageJob``; уменьшенные копии создаёт команда ``process_image_jobs``.
+Неудачные задачи повторяются с растущей паузой, после
+``BLOG_IMAGE_JOB_MAX_ATTEMPTS`` попыток остаются в статусе «Ошибка».
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from .cache import invalidate_tags, post_tags
+from .images import build_renditions
+from .models import ImageJob, Post
+
+
+def enqueue_image_job(post):
+    """Ставит в очередь обработку текущей картинки публикации."""
+    ImageJob.objects.filter(post=post).delete()
+    if post.image:
+        ImageJob.objects.create(post=post, image_name=post.image.name)
+
+
+def available_jobs():
+    return ImageJob.objects.filter(
+        status__in=(ImageJob.PENDING, ImageJob.RUNNING),
+        available_at__lte=timezone.now())
+
+
+def claim_next_job():
+    """Забирает ближайшую доступную задачу или возвращает None.
+
+    Задачу забирает тот воркер, чей условный UPDATE изменил строку.
+    Задачи удаляются вместе с публикацией и при смене картинки, поэтому
+    исчезнувшая строка просто пропускается.
+    """
+    for job in available_jobs().order_by('available_at', 'pk')[:10]:
+        now = timezone.now()
+        lease = timedelta(seconds=settings.BLOG_IMAGE_JOB_LEASE)
+        claimed = ImageJob.objects.filter(
+            pk=job.pk,
+            status=job.status,
+            available_at=job.available_at,
+        ).update(
+            status=ImageJob.RUNNING,
+            attempts=F('attempts') + 1,
+            available_at=now + lease)
+        if claimed:
+            try:
+                job.refresh_from_db()
+            except ImageJob.DoesNotExist:
+                continue
+            return job
+    return None
+
+
+def run_job(job):
+    """Создаёт копии картинки и сохраняет их в публикации."""
+    post = (
+        Post.objects.select_related('category', 'author')
+        .filter(pk=job.post_id).first())
+    if post is None or post.image.name != job.image_name:
+        return
+    data = build_renditions(post.image)
+    updated = Post.objects.filter(pk=post.pk, image=job.image_name).update(
+        image_renditions=data, updated_at=timezone.now())
+    if not updated:
+        # Картинку успели заменить; лишние копии уберёт collect_orphan_media.
+        return
+    invalidate_tags(*post_tags(
+        post.pk,
+        post.category.slug if post.category_id else None,
+        post.author.username))
+
+
+def process_next_job():
+    """Выполняет одну задачу; возвращает её или None, если очередь пуста."""
+    job = claim_next_job()
+    if job is None:
+        return None
+    try:
+        run_job(job)
+    except Exception as error:
+        fail_job(job, error)
+    else:
+        job.last_error = ''
+        ImageJob.objects.filter(pk=job.pk).delete()
+    return job
+
+
+def fail_job(job, error):
+    """Откладывает повтор задачи или помечает её ошибочной.
+
+    Если задачу за это время удалили, обновлять нечего — она завершена.
+    """
+    if job.attempts >= settings.BLOG_IMAGE_JOB_MAX_ATTEMPTS:
+        job.status = ImageJob.FAILED
+    else:
+        job.status = ImageJob.PENDING
+        job.available_at = timezone.now() + timedelta(
+            seconds=settings.BLOG_IMAGE_JOB_RETRY_DELAY
+            * 2 ** (job.attempts - 1))
+    job.last_error = f'{type(error).__name__}: {error}'
+    ImageJob.objects.filter(pk=job.pk, status=ImageJob.RUNNING).update(
+        status=job.status,
+        available_at=job.available_at,
+        last_error=job.last_error)
+
+
+def queue_depth():
+    """Число задач: ожидающих, доступных прямо сейчас и с ошибкой."""
+    now = timezone.now()
+    waiting = Q(status__in=(ImageJob.PENDING, ImageJob.RUNNING))
+    return ImageJob.objects.aggregate(
+        waiting=Count('pk', filter=waiting),
+        ready=Count('pk', filter=waiting & Q(available_at__lte=now)),
+        failed=Count('pk', filter=Q(status=ImageJob.FAILED)))
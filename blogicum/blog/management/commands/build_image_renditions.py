@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+
+from blog.jobs import enqueue_image_job
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Ставит в очередь создание уменьшенных копий для изображений '
+        'публикаций, у которых их ещё нет.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Пересоздать копии у всех публикаций с изображениями.')
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Сколько публикаций читать из БД за один запрос.')
+
+    def handle(self, *args, force, batch_size, **options):
+        last_pk = 0
+        queued = 0
+        while True:
+            batch = list(
+                Post.objects.exclude(image='')
+                .filter(pk__gt=last_pk)
+                .order_by('pk')
+                .only('pk', 'image', 'image_renditions')[:batch_size])
+            if not batch:
+                break
+            for post in batch:
+                data = post.image_renditions
+                if (not force and 'webp' in data
+                        and data.get('source') == post.image.name):
+                    continue
+                enqueue_image_job(post)
+                queued += 1
+            last_pk = batch[-1].pk
+        self.stdout.write(self.style.SUCCESS(
+            f'Поставлено в очередь публикаций: {queued}. '
+            'Копии создаст команда process_image_jobs.'))
@@ -0,0 +1,62 @@
+import posixpath
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blog.images import rendition_names
+from blog.models import ImageJob, Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет из хранилища изображения публикаций и их копии, на которые '
+        'не ссылается ни одна публикация.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--min-age',
+            type=int,
+            default=3600,
+            help='Не трогать файлы моложе стольких секунд: их могли только '
+                 'что загрузить, а публикацию ещё не сохранить.')
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только показать, какие файлы будут удалены.')
+
+    def handle(self, *args, min_age, dry_run, **options):
+        field = Post._meta.get_field('image')
+        storage = field.storage
+        referenced = set(
+            ImageJob.objects.values_list('image_name', flat=True))
+        posts = Post.objects.exclude(image='').values_list(
+            'image', 'image_renditions')
+        for image, data in posts.iterator():
+            referenced.add(image)
+            referenced |= rendition_names(data)
+        threshold = timezone.now() - timedelta(seconds=min_age)
+        removed = 0
+        for name in self.walk(storage, field.upload_to):
+            if (name in referenced
+                    or storage.get_modified_time(name) > threshold
+                    or Post.objects.filter(image=name).exists()):
+                # Последняя проверка — по индексу, на случай публикаций,
+                # сохранённых после чтения списка ссылок.
+                continue
+            self.stdout.write(name)
+            if not dry_run:
+                storage.delete(name)
+            removed += 1
+        verb = 'Будет удалено' if dry_run else 'Удалено'
+        self.stdout.write(self.style.SUCCESS(f'{verb} файлов: {removed}'))
+
+    def walk(self, storage, directory):
+        if not storage.exists(directory):
+            return
+        directories, files = storage.listdir(directory)
+        for filename in files:
+            yield posixpath.join(directory, filename)
+        for subdirectory in directories:
+            yield from self.walk(
+                storage, posixpath.join(directory, subdirectory))
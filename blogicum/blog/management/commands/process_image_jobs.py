@@ -0,0 +1,57 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blog.jobs import process_next_job, queue_depth
+from blog.models import ImageJob
+
+
+class Command(BaseCommand):
+    help = (
+        'Обрабатывает очередь изображений: создаёт уменьшенные копии и '
+        'повторяет неудачные задачи. С --interval работает постоянно.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=0,
+            help='Пауза в секундах, когда очередь пуста; '
+                 '0 — обработать доступные задачи и выйти.')
+        parser.add_argument(
+            '--retry-failed',
+            action='store_true',
+            help='Вернуть в очередь задачи, исчерпавшие попытки.')
+
+    def handle(self, *args, interval, retry_failed, **options):
+        if retry_failed:
+            ImageJob.objects.filter(status=ImageJob.FAILED).update(
+                status=ImageJob.PENDING, attempts=0,
+                available_at=timezone.now())
+        self.report_depth()
+        while True:
+            processed = failed = 0
+            while True:
+                job = process_next_job()
+                if job is None:
+                    break
+                processed += 1
+                if job.last_error:
+                    failed += 1
+                    self.stderr.write(
+                        f'Задача {job.pk} ({job.image_name}), попытка '
+                        f'{job.attempts}: {job.last_error}')
+            if processed:
+                self.stdout.write(
+                    f'Обработано задач: {processed}, с ошибкой: {failed}')
+                self.report_depth()
+            if not interval:
+                return
+            time.sleep(interval)
+
+    def report_depth(self):
+        depth = queue_depth()
+        self.stdout.write(
+            f'В очереди: {depth["waiting"]} (готовы к обработке: '
+            f'{depth["ready"]}), с ошибкой: {depth["failed"]}')
@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blog.scheduler import next_publication_time, publish_due_posts
+
+
+class Command(BaseCommand):
+    help = (
+        'Включает в ленту отложенные публикации, время которых наступило. '
+        'С --interval работает постоянно и просыпается к ближайшей '
+        'публикации.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=0,
+            help='Максимальная пауза между проверками в секундах; '
+                 '0 — выполнить один раз.')
+
+    def handle(self, *args, interval, **options):
+        while True:
+            published = publish_due_posts()
+            if published:
+                self.stdout.write(f'Опубликовано постов: {published}')
+            if not interval:
+                return
+            time.sleep(self.get_pause(interval))
+
+    def get_pause(self, interval):
+        next_time = next_publication_time()
+        if next_time is None:
+            return interval
+        until_next = (next_time - timezone.now()).total_seconds()
+        return min(interval, max(until_next, 0.1))
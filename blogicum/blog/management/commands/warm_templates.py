@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.template import TemplateSyntaxError
+
+from blog.warmup import warm_templates
+
+
+class Command(BaseCommand):
+    help = (
+        'Разбирает все шаблоны проекта: проверяет их перед выкладкой и '
+        'показывает, сколько времени занимает разбор.')
+
+    def handle(self, *args, **options):
+        try:
+            timings = warm_templates()
+        except TemplateSyntaxError as error:
+            raise CommandError(f'Ошибка в шаблоне: {error}') from error
+        for name, seconds in sorted(
+                timings, key=lambda item: item[1], reverse=True):
+            self.stdout.write(f'{seconds * 1000:8.2f} мс  {name}')
+        total = sum(seconds for _, seconds in timings)
+        self.stdout.write(self.style.SUCCESS(
+            f'Разобрано шаблонов: {len(timings)} за {total * 1000:.1f} мс'))
@@ -0,0 +1,200 @@
+"""Раздача загруженных файлов и собранной статики.
+
+Если перед приложением стоит nginx или Apache, передачу файла можно
+отдать им: ``BLOG_MEDIA_ACCEL`` = ``'x-accel-redirect'`` или
+``'x-sendfile'``. Тогда представление только проверяет путь и условные
+заголовки, а Python-воркер освобождается сразу. Без этой настройки файл
+отдаётся через ``FileResponse`` (WSGI-сервер может передать его через
+sendfile) с поддержкой Range, ETag и If-Modified-Since.
+"""
+import mimetypes
+import os
+import posixpath
+import re
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import (
+    get_conditional_response, patch_cache_control, patch_vary_headers)
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+
+# Имена ContentAddressedStorage: содержимое по такому адресу не меняется.
+IMMUTABLE_NAME_RE = re.compile(r'(^|/)[0-9a-f]{2}/[0-9a-f]{64}\.\w+$')
+# Имена ManifestStaticFilesStorage: ``bootstrap.min.0123456789ab.css``.
+HASHED_STATIC_RE = re.compile(r'\.[0-9a-f]{12}\.\w+$')
+# Заранее сжатые копии, которые пишет CompressedManifestStaticFilesStorage.
+PRECOMPRESSED = (('br', '.br'), ('gzip', '.gz'))
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class FileRange:
+    """Файл, из которого читается не больше ``length`` байт с ``start``."""
+
+    def __init__(self, file, start, length):
+        file.seek(start)
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+@require_safe
+def serve_media(request, path):
+    return serve_file(
+        request, settings.MEDIA_ROOT, path,
+        immutable=bool(IMMUTABLE_NAME_RE.search(path)),
+        max_age=settings.BLOG_MEDIA_MAX_AGE,
+        accel=settings.BLOG_MEDIA_ACCEL)
+
+
+@require_safe
+def serve_static(request, path):
+    """Статика из ``STATIC_ROOT``, сжатая заранее, если клиент это примет.
+
+    Имена с хешем от ``ManifestStaticFilesStorage`` кешируются навсегда.
+    """
+    return serve_file(
+        request, settings.STATIC_ROOT, path,
+        immutable=bool(HASHED_STATIC_RE.search(path)),
+        max_age=settings.BLOG_MEDIA_MAX_AGE,
+        encodings=PRECOMPRESSED)
+
+
+def serve_file(request, root, path, immutable, max_age, accel=None,
+               encodings=()):
+    try:
+        full_path = safe_join(root, path)
+    except SuspiciousFileOperation:
+        raise Http404
+    if not os.path.isfile(full_path):
+        raise Http404
+    content_type = (
+        mimetypes.guess_type(full_path)[0] or 'application/octet-stream')
+    encoding, full_path = pick_encoding(request, full_path, encodings)
+    stat = os.stat(full_path)
+    etag = f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+    last_modified = int(stat.st_mtime)
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = build_file_response(
+            request, full_path, path, stat.st_size, etag, last_modified,
+            content_type, accel)
+    if encoding:
+        response['Content-Encoding'] = encoding
+        if response.has_header('Content-Disposition'):
+            del response['Content-Disposition']
+    if encodings:
+        patch_vary_headers(response, ['Accept-Encoding'])
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    if immutable:
+        patch_cache_control(response, public=True, max_age=31536000,
+                            immutable=True)
+    else:
+        patch_cache_control(response, public=True, max_age=max_age)
+    return response
+
+
+def pick_encoding(request, full_path, encodings):
+    """Заранее сжатая копия файла, которую примет клиент, если она есть.
+
+    Из принимаемых (q > 0) выбирается кодировка с наибольшим q, при
+    равенстве — раньше стоящая в ``encodings``.
+    """
+    weights = parse_accept_encoding(request.headers.get('Accept-Encoding', ''))
+    candidates = []
+    for position, (encoding, suffix) in enumerate(encodings):
+        weight = weights.get(encoding, weights.get('*', 0))
+        if weight > 0 and os.path.isfile(full_path + suffix):
+            candidates.append((-weight, position, encoding, suffix))
+    if not candidates:
+        return None, full_path
+    _, _, encoding, suffix = min(candidates)
+    return encoding, full_path + suffix
+
+
+def parse_accept_encoding(header):
+    """Кодировки из Accept-Encoding и их веса q: ``{'gzip': 1.0, ...}``."""
+    weights = {}
+    for item in header.split(','):
+        coding, *params = [part.strip() for part in item.split(';')]
+        if not coding:
+            continue
+        weight = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[coding.lower()] = weight
+    return weights
+
+
+def build_file_response(request, full_path, path, size, etag, last_modified,
+                        content_type, accel=None):
+    if accel == 'x-accel-redirect':
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = posixpath.join(
+            settings.BLOG_MEDIA_ACCEL_PREFIX, path)
+        return response
+    if accel == 'x-sendfile':
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = full_path
+        return response
+
+    byte_range = parse_range(request, size, etag, last_modified)
+    if byte_range == 'unsatisfiable':
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+    file = open(full_path, 'rb')
+    if byte_range is None:
+        response = FileResponse(file, content_type=content_type)
+    else:
+        start, end = byte_range
+        response = FileResponse(
+            FileRange(file, start, end - start + 1),
+            status=206,
+            content_type=content_type)
+        response['Content-Length'] = end - start + 1
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response['Accept-Ranges'] = 'bytes'
+    return response
+
+
+def parse_range(request, size, etag, last_modified):
+    """Один диапазон из заголовка Range: (начало, конец) включительно.
+
+    None — отдать файл целиком (заголовка нет, он не понят или не прошла
+    проверка If-Range), ``'unsatisfiable'`` — диапазон за пределами файла.
+    """
+    match = RANGE_RE.match(request.headers.get('Range', '').strip())
+    if not match or not any(match.groups()):
+        return None
+    if_range = request.headers.get('If-Range')
+    if if_range and if_range != etag and (
+            parse_http_date_safe(if_range) != last_modified):
+        return None
+    first, last = match.groups()
+    if not first:
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return 'unsatisfiable'
+    return start, end
@@ -0,0 +1,128 @@
+"""Замеры времени обработки запросов.
+
+``TimingMiddleware`` считает для каждого запроса число SQL-запросов,
+время в БД, время отрисовки шаблона и общее время, отдаёт их в заголовке
+``Server-Timing`` (сотрудникам, а при ``BLOG_SERVER_TIMING`` — всем) и
+копит гистограммы по имени URL. Статистика хранится
+в памяти процесса и доступна сотрудникам на странице ``blog:stats``.
+"""
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+# Верхние границы корзин гистограммы общего времени, мс.
+HISTOGRAM_BOUNDS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+_stats_lock = threading.Lock()
+timing_stats = defaultdict(lambda: {
+    'requests': 0,
+    'queries': 0,
+    'db_ms': 0.0,
+    'template_ms': 0.0,
+    'total_ms': 0.0,
+    'max_ms': 0.0,
+    'histogram': Counter(),
+})
+
+
+class RequestTimer:
+    """Счётчики одного запроса; заодно обёртка для execute_wrapper."""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.template_seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_seconds += time.perf_counter() - started
+
+
+class TimingMiddleware:
+    """Ставится первой в MIDDLEWARE, чтобы замерять всю обработку."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timer = request.blog_timer = RequestTimer()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timer))
+            response = self.get_response(request)
+        total = time.perf_counter() - started
+        if self.show_timing(request):
+            response['Server-Timing'] = ', '.join([
+                f'db;desc="{timer.queries} SQL";'
+                f'dur={timer.db_seconds * 1000:.1f}',
+                f'tpl;dur={timer.template_seconds * 1000:.1f}',
+                f'total;dur={total * 1000:.1f}',
+            ])
+        match = request.resolver_match
+        record(match.view_name if match else 'unresolved', timer, total)
+        return response
+
+    def show_timing(self, request):
+        if settings.BLOG_SERVER_TIMING:
+            return True
+        user = getattr(request, 'user', None)
+        return user is not None and user.is_staff
+
+    def process_template_response(self, request, response):
+        # Шаблон отрисовывается сразу после этого метода; время запросов,
+        # выполненных при отрисовке, вычитается из времени шаблона.
+        timer = request.blog_timer
+        started = time.perf_counter()
+        db_before = timer.db_seconds
+
+        def stop_timer(response):
+            timer.template_seconds += (
+                time.perf_counter() - started
+                - (timer.db_seconds - db_before))
+
+        response.add_post_render_callback(stop_timer)
+        return response
+
+
+def record(view_name, timer, total):
+    total_ms = total * 1000
+    bucket = bisect_left(HISTOGRAM_BOUNDS, total_ms)
+    label = (
+        f'<={HISTOGRAM_BOUNDS[bucket]}ms' if bucket < len(HISTOGRAM_BOUNDS)
+        else f'>{HISTOGRAM_BOUNDS[-1]}ms')
+    with _stats_lock:
+        stats = timing_stats[view_name]
+        stats['requests'] += 1
+        stats['queries'] += timer.queries
+        stats['db_ms'] += timer.db_seconds * 1000
+        stats['template_ms'] += timer.template_seconds * 1000
+        stats['total_ms'] += total_ms
+        stats['max_ms'] = max(stats['max_ms'], total_ms)
+        stats['histogram'][label] += 1
+
+
+def get_timing_stats():
+    """Средние значения и гистограммы по именам URL."""
+    with _stats_lock:
+        return {
+            view_name: {
+                'requests': stats['requests'],
+                'avg_queries': stats['queries'] / stats['requests'],
+                'avg_db_ms': stats['db_ms'] / stats['requests'],
+                'avg_template_ms': stats['template_ms'] / stats['requests'],
+                'avg_total_ms': stats['total_ms'] / stats['requests'],
+                'max_ms': stats['max_ms'],
+                'histogram': dict(stats['histogram']),
+            }
+            for view_name, stats in sorted(timing_stats.items())
+        }
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.16 on 2026-10-17 04:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0007_post_is_live'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='image_renditions',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Размеры оригинала и его уменьшенных копий для srcset.', verbose_name='Копии изображения'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+from django.db import migrations
+
+# Индексы префиксов из 2 и 3 символов: короткие начала слов, которыми
+# ищет поиск, не перебирают все подходящие слова словаря.
+CREATE_TABLE = (
+    'CREATE VIRTUAL TABLE blog_post_fts USING fts5('
+    "title, text, tokenize='unicode61 remove_diacritics 2'{options})")
+
+FILL_TABLE = (
+    'INSERT INTO blog_post_fts (rowid, title, text) '
+    'SELECT id, title, text FROM blog_post')
+
+
+def recreate_search_index(options):
+    def operation(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        schema_editor.execute('DROP TABLE blog_post_fts')
+        schema_editor.execute(CREATE_TABLE.format(options=options))
+        schema_editor.execute(FILL_TABLE)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0011_post_search_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            recreate_search_index(", prefix='2 3'"),
+            recreate_search_index('')),
+    ]
@@ -1,5 +1,10 @@
 from django.db import models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from .storage import ContentAddressedStorage
 
 User = get_user_model()
 
@@ -51,6 +56,49 @@ class Category(PublishedModelMixin):
         return self.title
 
 
+class PostQuerySet(models.QuerySet):
+    """Общие выборки публикаций для всех страниц блога."""
+
+    def published(self):
+        """Публикации, доступные всем читателям.
+
+        Флаг is_live считает Post.save() и сигналы; после bulk_create или
+        UPDATE в обход модели нужно вызвать ``refresh_live()``.
+        """
+        return self.filter(is_live=True)
+
+    def should_be_live(self):
+        return self.filter(
+            is_published=True,
+            category__is_published=True,
+            pub_date__lte=timezone.now(),
+        )
+
+    def refresh_live(self):
+        """Пересчитывает флаг is_live; возвращает число изменённых строк."""
+        live = self.should_be_live()
+        return (
+            live.filter(is_live=False).update(is_live=True)
+            + self.filter(is_live=True).exclude(pk__in=live.values('pk'))
+            .update(is_live=False))
+
+    def recount_comments(self):
+        """Пересчитывает comment_count одним UPDATE с подзапросом."""
+        return self.update(comment_count=Coalesce(
+            Subquery(
+                Comment.objects.filter(post=OuterRef('pk'))
+                .order_by()
+                .values('post')
+                .annotate(total=Count('pk'))
+                .values('total'),
+                output_field=models.IntegerField()),
+            0))
+
+    def with_card_data(self):
+        """Подгружает связанные объекты, выводимые в карточке поста."""
+        return self.select_related('location', 'author', 'category')
+
+
 class Post(PublishedModelMixin):
     title = models.CharField(max_length=256, verbose_name='Заголовок')
     text = models.TextField(verbose_name='Текст')
@@ -85,15 +133,76 @@ class Post(PublishedModelMixin):
     image = models.ImageField(
         'Изображение',
         upload_to='posts_images',
-        blank=True)
+        storage=ContentAddressedStorage(),
+        blank=True,
+        db_index=True)
+    image_renditions = models.JSONField(
+        'Копии изображения',
+        default=dict,
+        blank=True,
+        editable=False,
+        help_text='Размеры оригинала и его уменьшенных копий для srcset.')
+    comment_count = models.PositiveIntegerField(
+        'Число комментариев',
+        default=0,
+        editable=False)
+    updated_at = models.DateTimeField(
+        default=timezone.now,
+        editable=False,
+        verbose_name='Изменено')
+    is_live = models.BooleanField(
+        'Видна читателям',
+        default=False,
+        editable=False,
+        help_text=(
+            'Опубликована, категория опубликована и время публикации '
+            'наступило; отложенные посты включает команда '
+            'publish_scheduled.'))
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
+        indexes = [
+            models.Index(
+                fields=['pub_date', 'id'],
+                condition=models.Q(is_live=True),
+                name='post_live_feed_idx'),
+            models.Index(
+                fields=['category', 'pub_date', 'id'],
+                condition=models.Q(is_live=True),
+                name='post_live_category_feed_idx'),
+            models.Index(
+                fields=['pub_date'],
+                condition=models.Q(is_live=False, is_published=True),
+                name='post_scheduled_idx'),
+            models.Index(
+                fields=['author', 'pub_date', 'id'],
+                name='post_author_feed_idx'),
+        ]
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, update_fields=None, **kwargs):
+        # Не auto_now: загрузка фикстур (raw) обходит pre_save полей, и
+        # без значения по умолчанию столбец остался бы пустым.
+        self.updated_at = timezone.now()
+        self.is_live = self.should_be_live()
+        if update_fields is not None:
+            update_fields = {*update_fields, 'updated_at', 'is_live'}
+        super().save(*args, update_fields=update_fields, **kwargs)
+
+    def should_be_live(self):
+        """Проверка для is_live по уже загруженному объекту."""
+        return (
+            self.is_published
+            and self.category is not None
+            and self.category.is_published
+            and self.pub_date <= timezone.now()
+        )
+
 
 class Comment(models.Model):
     text = models.TextField('Текст комментария')
@@ -113,6 +222,61 @@ class Comment(models.Model):
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
         ordering = ('created_at',)
+        indexes = [
+            models.Index(
+                fields=['post', 'created_at', 'id'],
+                name='comment_post_page_idx'),
+        ]
 
     def __str__(self):
         return f'Комментарий пользователя {self.author}'
+
+
+class ImageJob(models.Model):
+    """Задача на создание копий изображения публикации.
+
+    Очередь хранится в БД: воркер ``process_image_jobs`` забирает задачи,
+    у которых наступил ``available_at``, и на время обработки сдвигает его
+    вперёд, так что задачи упавшего воркера со временем снова доступны.
+    """
+
+    PENDING = 'pending'
+    RUNNING = 'running'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (PENDING, 'В очереди'),
+        (RUNNING, 'Обрабатывается'),
+        (FAILED, 'Ошибка'),
+    )
+
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='image_jobs',
+        verbose_name='Публикация')
+    image_name = models.CharField('Файл изображения', max_length=255)
+    status = models.CharField(
+        'Состояние',
+        max_length=16,
+        choices=STATUS_CHOICES,
+        default=PENDING)
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    available_at = models.DateTimeField(
+        'Доступна с',
+        default=timezone.now)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Добавлено')
+
+    class Meta:
+        verbose_name = 'задача обработки изображения'
+        verbose_name_plural = 'Очередь обработки изображений'
+        indexes = [
+            models.Index(
+                fields=['status', 'available_at'],
+                name='image_job_queue_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.image_name} ({self.get_status_display()})'
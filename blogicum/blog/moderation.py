@@ -0,0 +1,104 @@
+"""Массовая модерация публикаций и комментариев.
+
+Действия выполняются пачками по ``BLOG_MODERATION_CHUNK_SIZE`` строк:
+одна транзакция и несколько UPDATE/DELETE на пачку вместо сохранения и
+удаления объектов по одному. Побочные эффекты поштучных сигналов —
+флаг ``is_live``, счётчики комментариев, поисковый индекс и кеш
+страниц — обрабатываются здесь же, тоже пачками. Файлы картинок
+удалённых публикаций убирает ``collect_orphan_media``.
+"""
+import time
+from itertools import chain
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .cache import invalidate_tags, post_tags
+from .models import Comment, ImageJob, Post
+from .search import get_search_backend
+
+
+def pk_chunks(queryset, chunk_size=None):
+    """Первичные ключи выборки пачками, по возрастанию."""
+    chunk_size = chunk_size or settings.BLOG_MODERATION_CHUNK_SIZE
+    queryset = queryset.order_by('pk').values_list('pk', flat=True)
+    last_pk = None
+    while True:
+        chunk_queryset = queryset
+        if last_pk is not None:
+            chunk_queryset = queryset.filter(pk__gt=last_pk)
+        chunk = list(chunk_queryset[:chunk_size])
+        if not chunk:
+            return
+        yield chunk
+        last_pk = chunk[-1]
+
+
+def run_in_chunks(queryset, process, progress=None):
+    """Вызывает ``process(pks)`` для каждой пачки; возвращает итог.
+
+    ``progress(done, seconds)`` вызывается после каждой пачки.
+    """
+    started = time.perf_counter()
+    done = 0
+    for chunk in pk_chunks(queryset):
+        with transaction.atomic():
+            done += process(chunk)
+        if progress is not None:
+            progress(done, time.perf_counter() - started)
+    return done, time.perf_counter() - started
+
+
+def _tags_for_posts(pks):
+    rows = Post.objects.filter(pk__in=pks).values_list(
+        'pk', 'category__slug', 'author__username')
+    return list(chain.from_iterable(post_tags(*row) for row in rows))
+
+
+def update_posts(queryset, progress=None, **changes):
+    """Меняет поля публикаций пачками и пересчитывает их видимость."""
+    def process(pks):
+        chunk = Post.objects.filter(pk__in=pks)
+        tags = _tags_for_posts(pks)
+        updated = chunk.update(updated_at=timezone.now(), **changes)
+        chunk.refresh_live()
+        invalidate_tags('posts', *tags, *_tags_for_posts(pks))
+        return updated
+
+    return run_in_chunks(queryset, process, progress)
+
+
+def delete_posts(queryset, progress=None):
+    """Удаляет публикации вместе с комментариями и задачами картинок."""
+    search = get_search_backend()
+
+    def process(pks):
+        tags = _tags_for_posts(pks)
+        # _raw_delete — одиночный DELETE без загрузки объектов и поштучных
+        # сигналов, их работа сделана ниже для всей пачки. Набор связей и
+        # обработчиков закреплён в test_moderation_covers_delete_side_effects.
+        for queryset in (
+                Comment.objects.filter(post_id__in=pks),
+                ImageJob.objects.filter(post_id__in=pks)):
+            queryset._raw_delete(queryset.db)
+        posts = Post.objects.filter(pk__in=pks)
+        deleted = posts._raw_delete(posts.db)
+        search.remove_many(pks)
+        invalidate_tags('posts', 'comments', *tags)
+        return deleted
+
+    return run_in_chunks(queryset, process, progress)
+
+
+def delete_comments(queryset, progress=None):
+    """Удаляет комментарии и пересчитывает счётчики их публикаций."""
+    def process(pks):
+        comments = Comment.objects.filter(pk__in=pks)
+        post_ids = set(comments.values_list('post_id', flat=True))
+        deleted = comments._raw_delete(comments.db)
+        Post.objects.filter(pk__in=post_ids).recount_comments()
+        invalidate_tags('comments', *_tags_for_posts(post_ids))
+        return deleted
+
+    return run_in_chunks(queryset, process, progress)
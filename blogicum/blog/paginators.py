@@ -0,0 +1,227 @@
+import base64
+import binascii
+import json
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.paginator import InvalidPage, Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+from .cache import make_key
+
+
+class CachedCountPaginator(Paginator):
+    """Paginator, который кеширует общее число объектов.
+
+    Число хранится под ключом ``count_key`` и сбрасывается сменой версии
+    тегов ``count_tags``. Если СУБД умеет оценивать размер выборки и оценка
+    не меньше ``BLOG_PAGINATOR_ESTIMATE_THRESHOLD``, точный COUNT(*)
+    не выполняется.
+    """
+
+    stats = Counter()
+
+    def __init__(self, object_list, per_page, orphans=0,
+                 allow_empty_first_page=True, count_key=None,
+                 count_tags=('posts',)):
+        super().__init__(object_list, per_page, orphans,
+                         allow_empty_first_page)
+        self.count_key = count_key
+        self.count_tags = count_tags
+
+    @cached_property
+    def count(self):
+        if self.count_key is None:
+            return super().count
+        key = make_key('blog:count', self.count_tags, self.count_key)
+        count = cache.get(key)
+        if count is not None:
+            self.stats['hits'] += 1
+            return count
+        self.stats['misses'] += 1
+        count = self.estimate_count()
+        threshold = settings.BLOG_PAGINATOR_ESTIMATE_THRESHOLD
+        if count is not None and threshold is not None and count >= threshold:
+            self.stats['estimates'] += 1
+        else:
+            count = super().count
+        cache.set(key, count, settings.BLOG_PAGINATOR_COUNT_TIMEOUT)
+        return count
+
+    def estimate_count(self):
+        """Оценка числа строк по плану запроса или None."""
+        queryset = self.object_list
+        if not hasattr(queryset, 'query'):
+            return None
+        connection = connections[queryset.db]
+        if connection.vendor != 'postgresql':
+            return None
+        sql, params = queryset.order_by().query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
+
+
+class CursorPage:
+    """Страница выборки, полученная по курсору, без подсчёта всех строк."""
+
+    cursor_paginated = True
+
+    def __init__(self, object_list, paginator,
+                 next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f'<CursorPage of {len(self.object_list)} items>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """Постраничный вывод по ключу сортировки (keyset pagination).
+
+    Вместо OFFSET и COUNT(*) следующая страница выбирается условием
+    «строго после последней записи», поэтому стоимость запроса не зависит
+    от номера страницы. Последнее поле ``ordering`` должно быть уникальным.
+    """
+
+    def __init__(self, queryset, per_page, ordering=('-pub_date', '-id')):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self.fields = [name.lstrip('-') for name in self.ordering]
+        self.descending = self.ordering[0].startswith('-')
+
+    def page(self, cursor=None):
+        if not cursor:
+            return self._build_page(self.queryset, None, forward=True)
+        forward, values = self.decode_cursor(cursor)
+        return self._build_page(
+            self.queryset.filter(self._keyset_filter(values, forward)),
+            values,
+            forward)
+
+    def _build_page(self, queryset, values, forward):
+        ordering = self.ordering if forward else self._reversed_ordering()
+        items = list(queryset.order_by(*ordering)[:self.per_page + 1])
+        has_more = len(items) > self.per_page
+        items = items[:self.per_page]
+        if not forward:
+            items.reverse()
+        if not items:
+            return CursorPage(items, self)
+        has_next = has_more if forward else True
+        has_previous = values is not None if forward else has_more
+        return CursorPage(
+            items,
+            self,
+            next_cursor=(
+                self.encode_cursor(items[-1], forward=True)
+                if has_next else None),
+            previous_cursor=(
+                self.encode_cursor(items[0], forward=False)
+                if has_previous else None))
+
+    def _reversed_ordering(self):
+        return tuple(
+            name[1:] if name.startswith('-') else f'-{name}'
+            for name in self.ordering)
+
+    def _keyset_filter(self, values, forward):
+        lookup = 'lt' if self.descending == forward else 'gt'
+        condition = Q()
+        equal = Q()
+        for field, value in zip(self.fields, values):
+            condition |= equal & Q(**{f'{field}__{lookup}': value})
+            equal &= Q(**{field: value})
+        # Дублирующее нестрогое условие по первому полю позволяет СУБД
+        # прочитать индекс одним диапазоном вместо объединения по OR.
+        return Q(**{f'{self.fields[0]}__{lookup}e': values[0]}) & condition
+
+    def encode_cursor(self, item, forward=True):
+        model_fields = self.queryset.model._meta
+        values = [
+            model_fields.get_field(field).value_to_string(item)
+            for field in self.fields]
+        payload = json.dumps(['n' if forward else 'p', values])
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+
+    def decode_cursor(self, cursor):
+        model_fields = self.queryset.model._meta
+        try:
+            direction, raw_values = json.loads(
+                base64.urlsafe_b64decode(cursor.encode()))
+            values = [
+                model_fields.get_field(field).to_python(value)
+                for field, value in zip(self.fields, raw_values)]
+        except (TypeError, ValueError, ValidationError,
+                binascii.Error) as error:
+            raise InvalidPage('Неверный курсор страницы.') from error
+        if (direction not in ('n', 'p')
+                or len(raw_values) != len(self.fields)
+                or None in values):
+            raise InvalidPage('Неверный курсор страницы.')
+        return direction == 'n', values
+
+
+class RankedCursorPaginator:
+    """Постраничный вывод результатов поиска по релевантности.
+
+    Бэкенд поиска отдаёт пары (оценка, id) строго после курсора, а сами
+    объекты читаются из ``queryset`` одним запросом по этим id. Листать
+    можно только вперёд; первая страница — без курсора.
+    """
+
+    def __init__(self, queryset, per_page, query, backend):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.query = query
+        self.backend = backend
+
+    def page(self, cursor=None):
+        after = self.decode_cursor(cursor) if cursor else None
+        ranked = self.backend.ranked(self.query, self.per_page + 1, after)
+        has_next = len(ranked) > self.per_page
+        ranked = ranked[:self.per_page]
+        objects = self.queryset.in_bulk([pk for _, pk in ranked])
+        return CursorPage(
+            [objects[pk] for _, pk in ranked if pk in objects],
+            self,
+            next_cursor=self.encode_cursor(ranked[-1]) if has_next else None)
+
+    def encode_cursor(self, position):
+        payload = json.dumps(list(position))
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+
+    def decode_cursor(self, cursor):
+        try:
+            score, pk = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            return float(score), int(pk)
+        except (TypeError, ValueError, binascii.Error) as error:
+            raise InvalidPage('Неверный курсор страницы.') from error
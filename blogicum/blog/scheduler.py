@@ -0,0 +1,45 @@
+"""Включение отложенных публикаций.
+
+Лента фильтрует посты по материализованному флагу ``Post.is_live``, а не
+по ``pub_date <= now()``. Когда время публикации наступает, флаг нужно
+включить и сбросить кеш страниц — этим и занимается ``publish_due_posts``.
+"""
+from itertools import chain
+
+from django.db import transaction
+from django.db.models import Min
+from django.utils import timezone
+
+from .cache import invalidate_tags, post_tags
+from .models import Post
+
+
+def scheduled_posts():
+    return Post.objects.filter(
+        is_live=False, is_published=True, category__is_published=True)
+
+
+def publish_due_posts():
+    """Включает посты, время которых наступило; возвращает их число.
+
+    Строки блокируются до UPDATE, а сам UPDATE ещё раз проверяет условия
+    видимости: пост, снятый с публикации после выборки, не включится.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        due = list(
+            scheduled_posts().filter(pub_date__lte=now)
+            .select_for_update(of=('self',))
+            .values_list('pk', 'category__slug', 'author__username'))
+        if not due:
+            return 0
+        updated = scheduled_posts().filter(
+            pk__in=[pk for pk, *_ in due], pub_date__lte=now,
+        ).update(is_live=True)
+    invalidate_tags('posts', *chain.from_iterable(
+        post_tags(*row) for row in due))
+    return updated
+
+
+def next_publication_time():
+    return scheduled_posts().aggregate(next=Min('pub_date'))['next']
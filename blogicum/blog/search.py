@@ -0,0 +1,146 @@
+"""Полнотекстовый поиск по публикациям.
+
+Бэкенд выбирается настройкой ``BLOG_SEARCH_BACKEND`` (путь к классу) или,
+если она пуста, по СУБД: на SQLite — индекс FTS5 ``blog_post_fts`` по
+заголовку и тексту, иначе — простой поиск через ``icontains``. Индекс
+обновляется сигналами при сохранении и удалении публикации; перестроить
+его целиком можно командой ``rebuild_search_index``.
+
+``ranked()`` отдаёт видимые публикации по релевантности парами
+(оценка, id): чем меньше оценка, тем выше результат. Следующая порция
+выбирается условием «строго после пары» — как в ``CursorPaginator``.
+"""
+import re
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+from .models import Post
+
+WORD_RE = re.compile(r'\w+')
+
+
+class SimpleSearchBackend:
+    """Поиск без индекса: каждое слово должно встретиться в одном из полей."""
+
+    fields = ('title', 'text')
+
+    def index(self, post):
+        pass
+
+    def remove(self, post_id):
+        self.remove_many([post_id])
+
+    def remove_many(self, post_ids):
+        pass
+
+    def rebuild(self):
+        return 0
+
+    def filter(self, queryset, query, fields=None):
+        condition = Q()
+        for word in WORD_RE.findall(query):
+            word_condition = Q()
+            for field in fields or self.fields:
+                word_condition |= Q(**{f'{field}__icontains': word})
+            condition &= word_condition
+        return queryset.filter(condition)
+
+    def ranked(self, query, limit, after=None):
+        """Без индекса нет и релевантности: сначала новые публикации."""
+        if not WORD_RE.search(query):
+            return []
+        queryset = self.filter(Post.objects.published(), query)
+        if after is not None:
+            queryset = queryset.filter(pk__lt=after[1])
+        return [
+            (-pk, pk)
+            for pk in queryset.order_by('-pk').values_list(
+                'pk', flat=True)[:limit]]
+
+
+class SQLiteFTSBackend(SimpleSearchBackend):
+    """Индекс FTS5: слова запроса ищутся как префиксы, все сразу."""
+
+    table = 'blog_post_fts'
+    # Веса столбцов (title, text) для bm25: совпадение в заголовке важнее.
+    weights = (10.0, 1.0)
+
+    def index(self, post):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {self.table} WHERE rowid = %s', [post.pk])
+            cursor.execute(
+                f'INSERT INTO {self.table} (rowid, title, text) '
+                'VALUES (%s, %s, %s)',
+                [post.pk, post.title, post.text])
+
+    def remove_many(self, post_ids):
+        post_ids = list(post_ids)
+        if not post_ids:
+            return
+        placeholders = ', '.join(['%s'] * len(post_ids))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {self.table} WHERE rowid IN ({placeholders})',
+                post_ids)
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table}')
+            cursor.execute(
+                f'INSERT INTO {self.table} (rowid, title, text) '
+                'SELECT id, title, text FROM blog_post')
+            return cursor.rowcount
+
+    def filter(self, queryset, query, fields=None):
+        match = self.match_expression(query, fields)
+        if match is None:
+            return queryset.none()
+        return queryset.filter(pk__in=RawSQL(
+            f'SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s',
+            [match]))
+
+    def ranked(self, query, limit, after=None):
+        match = self.match_expression(query)
+        if match is None:
+            return []
+        posts = Post._meta.db_table
+        score = f'bm25({self.table}, {", ".join(map(str, self.weights))})'
+        params = [match]
+        keyset = ''
+        if after is not None:
+            keyset = f'AND ({score}, {self.table}.rowid) > (%s, %s)'
+            params.extend(after)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT {score} AS score, {self.table}.rowid '
+                f'FROM {self.table} '
+                f'JOIN {posts} ON {posts}.id = {self.table}.rowid '
+                f'WHERE {self.table} MATCH %s AND {posts}.is_live '
+                f'{keyset} ORDER BY score, {self.table}.rowid LIMIT %s',
+                [*params, limit])
+            return cursor.fetchall()
+
+    def match_expression(self, query, fields=None):
+        """Запрос пользователя в синтаксисе FTS5 без его спецсимволов."""
+        words = WORD_RE.findall(query)
+        if not words:
+            return None
+        terms = ' AND '.join(f'"{word}"*' for word in words)
+        if fields:
+            return f'{{{" ".join(fields)}}} : ({terms})'
+        return terms
+
+
+@lru_cache(maxsize=None)
+def get_search_backend():
+    if settings.BLOG_SEARCH_BACKEND:
+        return import_string(settings.BLOG_SEARCH_BACKEND)()
+    if connection.vendor == 'sqlite':
+        return SQLiteFTSBackend()
+    return SimpleSearchBackend()
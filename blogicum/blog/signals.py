@@ -0,0 +1,216 @@
+from django.contrib.auth import get_user_model
+from django.db.models import F, Subquery
+from django.db.models.signals import (
+    post_delete, post_save, pre_delete, pre_save)
+from django.dispatch import receiver
+
+from .cache import SITE_TAG, invalidate_tags, post_tags
+from .jobs import enqueue_image_job
+from .search import get_search_backend
+from .models import Category, Comment, Location, Post
+
+User = get_user_model()
+
+
+def get_post_tags(post_id):
+    """Теги страниц публикации по данным из БД (до или после правки)."""
+    row = (
+        Post.objects.filter(pk=post_id)
+        .values_list('category__slug', 'author__username')
+        .first())
+    return post_tags(post_id, *row) if row else []
+
+
+def get_instance_tags(instance):
+    """Теги страниц публикации по ``category_id`` и ``author_id``.
+
+    Уже загруженные автор и категория используются без запросов, иначе
+    slug и имя читаются одним запросом по id.
+    """
+    if Post.author.is_cached(instance) and (
+            instance.category_id is None
+            or Post.category.is_cached(instance)):
+        category = instance.category
+        return post_tags(
+            instance.pk, category.slug if category else None,
+            instance.author.username)
+    row = (
+        User.objects.filter(pk=instance.author_id)
+        .values_list(
+            Subquery(
+                Category.objects.filter(pk=instance.category_id)
+                .values('slug')),
+            'username')
+        .first())
+    return post_tags(instance.pk, *row) if row else []
+
+
+@receiver(pre_save, sender=Comment)
+def remember_comment_post(sender, instance, raw=False, **kwargs):
+    if instance.pk and not raw:
+        instance._previous_post_id = (
+            Comment.objects.filter(pk=instance.pk)
+            .values_list('post_id', flat=True)
+            .first())
+
+
+@receiver(post_save, sender=Comment)
+def increment_comment_count(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        # Счётчик уже есть в фикстуре вместе с публикацией.
+        return
+    previous_post_id = getattr(instance, '_previous_post_id', None)
+    if created:
+        Post.objects.filter(pk=instance.post_id).update(
+            comment_count=F('comment_count') + 1)
+    elif previous_post_id and previous_post_id != instance.post_id:
+        # Комментарий перенесли к другой публикации.
+        Post.objects.filter(
+            pk=previous_post_id, comment_count__gt=0).update(
+            comment_count=F('comment_count') - 1)
+        Post.objects.filter(pk=instance.post_id).update(
+            comment_count=F('comment_count') + 1)
+
+
+@receiver(post_delete, sender=Comment)
+def decrement_comment_count(sender, instance, **kwargs):
+    Post.objects.filter(pk=instance.post_id, comment_count__gt=0).update(
+        comment_count=F('comment_count') - 1)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_pages(sender, instance, **kwargs):
+    previous_post_id = getattr(instance, '_previous_post_id', None)
+    previous_tags = (
+        get_post_tags(previous_post_id)
+        if previous_post_id not in (None, instance.post_id) else [])
+    invalidate_tags(
+        'comments', *previous_tags, *get_post_tags(instance.post_id))
+
+
+@receiver(pre_save, sender=Post)
+def remember_post_pages(sender, instance, raw=False, **kwargs):
+    if instance.pk and not raw:
+        instance._previous_post_row = (
+            Post.objects.filter(pk=instance.pk)
+            .values_list(
+                'category_id', 'author_id',
+                'category__slug', 'author__username')
+            .first())
+
+
+@receiver(post_save, sender=Post)
+def refresh_loaded_post(sender, instance, raw=False, **kwargs):
+    """Фикстуры сохраняют посты в обход Post.save(), где считается is_live."""
+    if raw:
+        Post.objects.filter(pk=instance.pk).refresh_live()
+
+
+@receiver(post_save, sender=Post)
+def index_post(sender, instance, **kwargs):
+    get_search_backend().index(instance)
+
+
+@receiver(post_delete, sender=Post)
+def unindex_post(sender, instance, **kwargs):
+    get_search_backend().remove(instance.pk)
+
+
+@receiver(post_save, sender=Post)
+def update_image_renditions(sender, instance, raw=False, **kwargs):
+    previous = instance.image_renditions
+    if raw or (instance.image.name or None) == previous.get('source'):
+        return
+    instance.image_renditions = (
+        {'source': instance.image.name} if instance.image else {})
+    Post.objects.filter(pk=instance.pk).update(
+        image_renditions=instance.image_renditions)
+    enqueue_image_job(instance)
+
+
+@receiver(post_save, sender=Post)
+def invalidate_saved_post_pages(sender, instance, raw=False, **kwargs):
+    if raw:
+        # При loaddata связанные объекты могут быть ещё не загружены.
+        invalidate_tags('posts', SITE_TAG)
+        return
+    previous = getattr(instance, '_previous_post_row', None)
+    if previous is None:
+        tags = get_instance_tags(instance)
+    else:
+        tags = post_tags(instance.pk, *previous[2:])
+        if previous[:2] != (instance.category_id, instance.author_id):
+            tags += get_instance_tags(instance)
+    invalidate_tags('posts', *tags)
+
+
+@receiver(post_delete, sender=Post)
+def invalidate_deleted_post_pages(sender, instance, **kwargs):
+    invalidate_tags('posts', *get_instance_tags(instance))
+
+
+@receiver(post_save, sender=Category)
+def refresh_category_posts(sender, instance, **kwargs):
+    Post.objects.filter(category=instance).refresh_live()
+
+
+@receiver(pre_delete, sender=Category)
+def hide_category_posts(sender, instance, **kwargs):
+    Post.objects.filter(category=instance).update(is_live=False)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_pages(sender, **kwargs):
+    invalidate_tags('posts', SITE_TAG)
+
+
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_location_pages(sender, **kwargs):
+    invalidate_tags(SITE_TAG)
+
+
+USER_CARD_FIELDS = ('username', 'first_name', 'last_name')
+
+
+def get_user_page_tags(user, username):
+    """Теги страниц, где выводится имя пользователя ``username``."""
+    tags = [f'post:{pk}' for pk in Post.objects.filter(
+        comment__author=user).values_list('pk', flat=True).distinct()]
+    for row in Post.objects.filter(author=user).values_list(
+            'pk', 'category__slug'):
+        tags += post_tags(*row, username)
+    return ['posts', 'feed', f'profile:{username}', *tags]
+
+
+@receiver(pre_save, sender=User)
+def remember_user_names(sender, instance, raw=False, **kwargs):
+    if instance.pk and not raw:
+        instance._previous_names = (
+            User.objects.filter(pk=instance.pk)
+            .values_list(*USER_CARD_FIELDS)
+            .first())
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_pages(sender, instance, created, raw=False, **kwargs):
+    """Сбрасывает страницы пользователя при смене имени.
+
+    Новый пользователь ещё нигде не выводится, а правки прочих полей
+    (пароль, время входа) на страницах не видны.
+    """
+    previous = getattr(instance, '_previous_names', None)
+    current = tuple(getattr(instance, field) for field in USER_CARD_FIELDS)
+    if created or raw or previous in (None, current):
+        return
+    invalidate_tags(
+        *get_user_page_tags(instance, previous[0]),
+        f'profile:{instance.username}')
+
+
+@receiver(pre_delete, sender=User)
+def invalidate_deleted_user_pages(sender, instance, **kwargs):
+    # После удаления публикации и комментарии пользователя уже не найти.
+    invalidate_tags(*get_user_page_tags(instance, instance.username))
@@ -0,0 +1,90 @@
+"""Хранилище загрузок с адресацией по содержимому.
+
+Имя файла — SHA-256 его содержимого, поэтому одинаковые картинки хранятся
+один раз, а файл по однажды выданному адресу никогда не меняется и может
+кешироваться навсегда. Файлы, на которые не ссылается ни одна
+публикация, удаляет команда ``collect_orphan_media``; повторная загрузка
+того же содержимого обновляет время изменения файла, чтобы команда не
+удалила его до сохранения публикации.
+"""
+import gzip
+import hashlib
+import os
+import posixpath
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import File
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """Сохраняет файлы под именем ``<каталог>/<ab>/<sha256><расширение>``."""
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        directory, filename = posixpath.split(name)
+        digest = self.get_digest(content)
+        name = posixpath.join(
+            directory, digest[:2],
+            digest + posixpath.splitext(filename)[1].lower())
+        if self.exists(name):
+            os.utime(self.path(name))
+            return name
+        return super().save(name, content, max_length)
+
+    @staticmethod
+    def get_digest(content):
+        sha256 = hashlib.sha256()
+        if content.seekable():
+            content.seek(0)
+        for chunk in content.chunks():
+            sha256.update(chunk)
+        if content.seekable():
+            content.seek(0)
+        return sha256.hexdigest()
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Статика с хешем в имени и заранее сжатыми копиями ``.gz``/``.br``.
+
+    Копии пишутся при collectstatic рядом с файлами с хешем, если они
+    хотя бы на ``min_saving`` меньше оригинала. Brotli — только при
+    установленном пакете ``brotli``.
+    """
+
+    compressible_extensions = (
+        '.css', '.js', '.svg', '.ico', '.txt', '.json', '.map', '.html')
+    min_size = 256
+    min_saving = 0.05
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        for name in set(self.hashed_files.values()):
+            if name.endswith(self.compressible_extensions):
+                self.compress(name)
+
+    def compress(self, name):
+        with self.open(name) as file:
+            content = file.read()
+        if len(content) < self.min_size:
+            return
+        variants = [('.gz', gzip.compress(content, 9, mtime=0))]
+        if brotli is not None:
+            variants.append(('.br', brotli.compress(content)))
+        for suffix, compressed in variants:
+            if len(compressed) <= len(content) * (1 - self.min_saving):
+                path = self.path(name + suffix)
+                with open(path, 'wb') as file:
+                    file.write(compressed)
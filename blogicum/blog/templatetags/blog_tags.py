@@ -0,0 +1,92 @@
+import time
+from collections import Counter
+
+from django import template
+from django.conf import settings
+from django.core.cache import caches
+from django.template.loader import render_to_string
+
+from ..cache import SITE_TAG, make_key
+
+register = template.Library()
+
+card_cache_stats = Counter()
+
+
+@register.simple_tag(takes_context=True)
+def post_card(context, post):
+    """Карточка публикации из кеша фрагментов.
+
+    Версия карточки — время правки поста, число комментариев и имя
+    автора; правки категорий и мест сбрасывают все карточки через тег
+    ``site``.
+    """
+    card_cache = caches[settings.BLOG_PAGE_CACHE_ALIAS]
+    site_version = context.render_context.get('blog_card_site_version')
+    if site_version is None:
+        site_version = make_key('site', [SITE_TAG])
+        context.render_context['blog_card_site_version'] = site_version
+    key = (
+        f'blog:card:{post.pk}:{post.updated_at.timestamp()}:'
+        f'{post.comment_count}:{post.author.username}:{site_version}')
+    html = card_cache.get(key)
+    if html is not None:
+        card_cache_stats['hits'] += 1
+        return html
+    started = time.perf_counter()
+    html = render_to_string('includes/post_card.html', {'post': post})
+    card_cache_stats['misses'] += 1
+    card_cache_stats['render_seconds'] += time.perf_counter() - started
+    card_cache.set(key, html, settings.BLOG_CARD_CACHE_TIMEOUT)
+    return html
+
+
+@register.inclusion_tag('includes/post_image.html')
+def post_image(post, sizes, fallback_width, loading='lazy'):
+    """Картинка публикации с уменьшенными копиями в ``srcset``.
+
+    В ``src`` попадает самая узкая копия не уже ``fallback_width`` — её
+    получат браузеры без поддержки ``srcset``. Копии в WebP выводятся
+    отдельным ``<source>`` внутри ``<picture>``, браузер выберет их сам.
+    """
+    data = post.image_renditions
+    if data.get('source') != post.image.name:
+        # Копии ещё не готовы или остались от прежней картинки.
+        data = {}
+    storage = post.image.storage
+    candidates = [
+        (storage.url(rendition['name']), rendition['width'])
+        for rendition in data.get('renditions', ())]
+    if 'width' in data:
+        candidates.append((post.image.url, data['width']))
+    webp_srcset = ', '.join(
+        f'{storage.url(rendition["name"])} {rendition["width"]}w'
+        for rendition in data.get('webp', ()))
+    src = next(
+        (url for url, width in candidates if width >= fallback_width),
+        post.image.url)
+    return {
+        'post': post,
+        'src': src,
+        'srcset': ', '.join(f'{url} {width}w' for url, width in candidates),
+        'webp_srcset': webp_srcset,
+        'sizes': sizes,
+        'width': data.get('width'),
+        'height': data.get('height'),
+        'loading': loading,
+    }
+
+
+def get_card_cache_stats():
+    """Доля попаданий и сэкономленное время по средней отрисовке."""
+    hits = card_cache_stats['hits']
+    misses = card_cache_stats['misses']
+    average_render = (
+        card_cache_stats['render_seconds'] / misses if misses else 0.0)
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': hits / (hits + misses) if hits + misses else 0.0,
+        'render_seconds': card_cache_stats['render_seconds'],
+        'saved_seconds': hits * average_render,
+    }
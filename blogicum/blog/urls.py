@@ -1,6 +1,6 @@
 from django.urls import path
 
-from . import views
+from . import feeds, views
 
 app_name = 'blog'
 
@@ -9,6 +9,9 @@ urlpatterns = [
     path('posts/<int:id>/',
          views.PostDetailView.as_view(),
          name='post_detail'),
+    path('posts/<int:id>/comments/',
+         views.PostCommentsView.as_view(),
+         name='post_comments'),
     path('category/<slug:category_slug>/',
          views.CategoryPostsListView.as_view(),
          name='category_posts'),
@@ -34,4 +37,20 @@ urlpatterns = [
     path('posts/<int:post_id>/delete_comment/<int:comment_id>/',
          views.CommentDeleteView.as_view(),
          name='delete_comment'),
+    path('feed/rss/', feeds.LatestPostsFeed(), name='feed_rss'),
+    path('feed/atom/', feeds.LatestPostsAtomFeed(), name='feed_atom'),
+    path('category/<slug:category_slug>/rss/',
+         feeds.CategoryPostsFeed(),
+         name='category_feed_rss'),
+    path('category/<slug:category_slug>/atom/',
+         feeds.CategoryPostsAtomFeed(),
+         name='category_feed_atom'),
+    path('profile/<slug:username>/rss/',
+         feeds.AuthorPostsFeed(),
+         name='profile_feed_rss'),
+    path('profile/<slug:username>/atom/',
+         feeds.AuthorPostsAtomFeed(),
+         name='profile_feed_atom'),
+    path('search/', views.SearchView.as_view(), name='search'),
+    path('stats/', views.StatsView.as_view(), name='stats'),
 ]
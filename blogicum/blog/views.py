@@ -1,9 +1,11 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Count
+from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from django.core.paginator import InvalidPage
+from django.db import transaction
+from django.http import Http404, JsonResponse
 from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse, reverse_lazy
-from django.utils import timezone
 from django.views.generic import (
     CreateView,
     DeleteView,
@@ -13,20 +15,54 @@ from django.views.generic import (
     View
 )
 
+from .cache import AnonymousPageCacheMixin, ConditionalPageMixin
 from .forms import CommentForm, PostForm, ProfileEditForm
+from .middleware import get_timing_stats
 from .models import Category, Comment, Post
+from .paginators import (
+    CachedCountPaginator, CursorPaginator, RankedCursorPaginator)
+from .search import get_search_backend
+from .templatetags.blog_tags import get_card_cache_stats
 from .utils import get_post_data
 
 User = get_user_model()
 
 POSTS_PER_PAGE = 10
 
+COMMENTS_PER_PAGE = 20
+
 
 class PostMixin:
     model = Post
     template_name = 'blog/create.html'
 
 
+class PostListMixin:
+    model = Post
+    paginate_by = POSTS_PER_PAGE
+    paginator_class = CachedCountPaginator
+    cursor_kwarg = 'cursor'
+    # Ключ кеша числа публикаций; None — считать COUNT(*) каждый раз.
+    count_key = None
+
+    def get_count_key(self):
+        return self.count_key
+
+    def get_paginator(self, queryset, per_page, **kwargs):
+        return super().get_paginator(
+            queryset, per_page, count_key=self.get_count_key(), **kwargs)
+
+    def paginate_queryset(self, queryset, page_size):
+        if not settings.BLOG_CURSOR_PAGINATION:
+            return super().paginate_queryset(queryset, page_size)
+        paginator = CursorPaginator(queryset, page_size)
+        try:
+            page = paginator.page(self.request.GET.get(self.cursor_kwarg))
+        except InvalidPage as error:
+            raise Http404(str(error))
+        return paginator, page, page.object_list, page.has_other_pages()
+
+
 class PostCreateView(PostMixin, LoginRequiredMixin, CreateView):
     form_class = PostForm
 
@@ -72,32 +108,34 @@ class PostDeleteView(PostMixin, LoginRequiredMixin, DeleteView):
         )
 
 
-class IndexListView(ListView):
-    model = Post
-    paginate_by = POSTS_PER_PAGE
+class IndexListView(ConditionalPageMixin, AnonymousPageCacheMixin,
+                    PostListMixin, ListView):
     template_name = 'blog/index.html'
+    count_key = 'index'
+    page_cache_tags = ('feed',)
 
     def get_queryset(self):
         return (
-            self.model.objects
-            .filter(is_published=True,
-                    category__is_published=True,
-                    pub_date__lte=timezone.now())
-            .annotate(comment_count=Count('comment'))
-            .order_by('-pub_date'))
+            self.model.objects.published()
+            .with_card_data()
+            .order_by('-pub_date', '-id'))
 
 
-class ProfileListView(ListView):
-    model = Post
-    paginate_by = POSTS_PER_PAGE
+class ProfileListView(ConditionalPageMixin, AnonymousPageCacheMixin,
+                      PostListMixin, ListView):
     template_name = 'blog/profile.html'
 
     def get_queryset(self):
         return (
-            self.model.objects.select_related('author')
+            self.model.objects.with_card_data()
             .filter(author__username=self.kwargs['username'])
-            .annotate(comment_count=Count('comment'))
-            .order_by('-pub_date'))
+            .order_by('-pub_date', '-id'))
+
+    def get_count_key(self):
+        return f'profile:{self.kwargs["username"]}'
+
+    def get_page_cache_tags(self):
+        return [f'profile:{self.kwargs["username"]}']
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -123,42 +161,62 @@ class ProfileUpdateView(LoginRequiredMixin, UpdateView):
         return reverse('blog:profile', args=[self.request.user.username])
 
 
-class PostDetailView(DetailView):
+class PostDetailView(ConditionalPageMixin, AnonymousPageCacheMixin,
+                     DetailView):
+    """Страница публикации.
+
+    Публикация читается одним запросом вместе с автором, категорией и
+    местоположением, права на просмотр проверяются уже в Python. Второй
+    запрос — страница комментариев с их авторами. Итого 2 запроса для
+    анонимного читателя и 4 для вошедшего пользователя (плюс сессия и
+    пользователь) при любом числе комментариев.
+    """
+
     model = Post
     template_name = 'blog/detail.html'
+    comments_per_page = COMMENTS_PER_PAGE
+    cursor_kwarg = 'cursor'
 
     def get_object(self, queryset=None):
-        post_object = get_object_or_404(
-            self.model.objects.select_related(
-                'location', 'author', 'category'
-            ), pk=self.kwargs['id'])
-        if self.request.user == post_object.author:
-            return get_object_or_404(
-                self.model.objects.select_related(
-                    'location', 'author', 'category'
-                ), pk=self.kwargs['id'])
-        return get_object_or_404(
-            self.model.objects.select_related(
-                'location', 'author', 'category'
-            )
-            .filter(
-                pub_date__lte=timezone.now(),
-                is_published=True,
-                category__is_published=True), pk=self.kwargs['id'])
+        post = get_object_or_404(
+            self.model.objects.with_card_data(), pk=self.kwargs['id'])
+        if post.author != self.request.user and not post.is_live:
+            raise Http404('Публикация не найдена.')
+        return post
+
+    def get_page_cache_tags(self):
+        return [f'post:{self.kwargs["id"]}']
+
+    def get_comments_page(self):
+        paginator = CursorPaginator(
+            self.object.comment.select_related('author'),
+            self.comments_per_page,
+            ordering=('created_at', 'id'))
+        try:
+            return paginator.page(self.request.GET.get(self.cursor_kwarg))
+        except InvalidPage as error:
+            raise Http404(str(error))
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
+        comments_page = self.get_comments_page()
         context['form'] = CommentForm()
-        context['comments'] = self.object.comment.select_related('author')
+        context['comments_page'] = comments_page
+        context['comments'] = comments_page.object_list
         return context
 
     def get_success_url(self):
         return reverse('blog:post_detail', kwargs={'id': self.kwargs['id']})
 
 
-class CategoryPostsListView(ListView):
-    model = Post
-    paginate_by = POSTS_PER_PAGE
+class PostCommentsView(PostDetailView):
+    """Следующая порция комментариев для подгрузки на странице поста."""
+
+    template_name = 'includes/comment_list.html'
+
+
+class CategoryPostsListView(ConditionalPageMixin, AnonymousPageCacheMixin,
+                            PostListMixin, ListView):
     template_name = 'blog/category.html'
 
     def get_queryset(self):
@@ -168,11 +226,15 @@ class CategoryPostsListView(ListView):
             is_published=True)
 
         return (
-            category.posts.select_related('location', 'author', 'category')
-            .filter(is_published=True,
-                    pub_date__lte=timezone.now())
-            .annotate(comment_count=Count('comment'))
-            .order_by('-pub_date'))
+            category.posts.published()
+            .with_card_data()
+            .order_by('-pub_date', '-id'))
+
+    def get_count_key(self):
+        return f'category:{self.kwargs["category_slug"]}'
+
+    def get_page_cache_tags(self):
+        return [f'category:{self.kwargs["category_slug"]}']
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -182,6 +244,41 @@ class CategoryPostsListView(ListView):
         return context
 
 
+class SearchView(ConditionalPageMixin, AnonymousPageCacheMixin, ListView):
+    """Поиск по заголовкам и текстам видимых публикаций.
+
+    Результаты упорядочены по релевантности и листаются курсором: один
+    запрос к индексу за страницу и один за сами публикации, без COUNT(*).
+    """
+
+    template_name = 'blog/search.html'
+    paginate_by = POSTS_PER_PAGE
+    cursor_kwarg = 'cursor'
+    max_query_length = 200
+    page_cache_tags = ('posts',)
+
+    def get_search_query(self):
+        return self.request.GET.get('q', '').strip()[:self.max_query_length]
+
+    def get_queryset(self):
+        return Post.objects.published().with_card_data()
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator = RankedCursorPaginator(
+            queryset, page_size, self.get_search_query(),
+            get_search_backend())
+        try:
+            page = paginator.page(self.request.GET.get(self.cursor_kwarg))
+        except InvalidPage as error:
+            raise Http404(str(error))
+        return paginator, page, page.object_list, page.has_other_pages()
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['query'] = self.get_search_query()
+        return context
+
+
 class CommentCreateView(LoginRequiredMixin, CreateView):
     model = Comment
     form_class = CommentForm
@@ -192,6 +289,7 @@ class CommentCreateView(LoginRequiredMixin, CreateView):
         self.post_obj = get_post_data(kwargs)
         return super().dispatch(request, *args, **kwargs)
 
+    @transaction.atomic
     def form_valid(self, form):
         form.instance.author = self.request.user
         form.instance.post = self.post_obj                 # проверить
@@ -226,4 +324,20 @@ class CommentUpdateView(CommentMixin, UpdateView):
 
 
 class CommentDeleteView(CommentMixin, DeleteView):
-    pass
+    @transaction.atomic
+    def delete(self, request, *args, **kwargs):
+        return super().delete(request, *args, **kwargs)
+
+
+class StatsView(UserPassesTestMixin, View):
+    """Статистика замеров этого процесса для сотрудников, в JSON."""
+
+    def test_func(self):
+        return self.request.user.is_staff
+
+    def get(self, request):
+        return JsonResponse({
+            'views': get_timing_stats(),
+            'card_cache': get_card_cache_stats(),
+            'paginator_count': dict(CachedCountPaginator.stats),
+        }, json_dumps_params={'ensure_ascii': False, 'indent': 2})
@@ -0,0 +1,33 @@
+"""Прогрев кеша шаблонов.
+
+С ``cached.Loader`` каждый шаблон разбирается при первом обращении к нему
+в процессе, и первые запросы после выкладки платят за разбор ``base.html``,
+карточек и пагинатора. ``warm_templates`` заранее загружает все шаблоны
+из каталогов ``DIRS`` — при старте WSGI-приложения (настройка
+``BLOG_WARM_TEMPLATES``) или командой ``warm_templates``.
+"""
+import time
+from pathlib import Path
+
+from django.template import engines
+
+TEMPLATE_SUFFIXES = ('.html', '.txt', '.xml')
+
+
+def project_templates(engine):
+    for directory in engine.dirs:
+        directory = Path(directory)
+        for path in sorted(directory.rglob('*')):
+            if path.suffix in TEMPLATE_SUFFIXES and path.is_file():
+                yield path.relative_to(directory).as_posix()
+
+
+def warm_templates(alias='django'):
+    """Загружает шаблоны проекта; возвращает [(имя, секунды разбора)]."""
+    engine = engines[alias].engine
+    timings = []
+    for name in project_templates(engine):
+        started = time.perf_counter()
+        engine.get_template(name)
+        timings.append((name, time.perf_counter() - started))
+    return timings
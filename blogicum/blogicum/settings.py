@@ -25,6 +25,7 @@ INSTALLED_APPS = [
 
 
 MIDDLEWARE = [
+    'blog.middleware.TimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -38,12 +39,23 @@ ROOT_URLCONF = 'blogicum.urls'
 
 TEMPLATES_DIR = BASE_DIR / "templates"
 
+TEMPLATE_LOADERS = [
+    "django.template.loaders.filesystem.Loader",
+    "django.template.loaders.app_directories.Loader",
+]
+
 TEMPLATES = [
     {
         "BACKEND": "django.template.backends.django.DjangoTemplates",
         "DIRS": [TEMPLATES_DIR],
-        "APP_DIRS": True,
         "OPTIONS": {
+            # Без DEBUG шаблоны разбираются один раз на процесс; прогреть
+            # кеш заранее можно командой warm_templates.
+            "loaders": (
+                TEMPLATE_LOADERS if DEBUG
+                else [("django.template.loaders.cached.Loader",
+                       TEMPLATE_LOADERS)]
+            ),
             "context_processors": [
                 "django.template.context_processors.debug",
                 "django.template.context_processors.request",
@@ -63,6 +75,22 @@ DATABASES = {
     }
 }
 
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'pages': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'pages',
+        'OPTIONS': {'MAX_ENTRIES': 1000},
+    },
+    # Версии тегов кеша общие для всех воркеров; на нескольких серверах
+    # сюда нужен memcached или Redis.
+    'tags': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'tag_cache',
+    },
+}
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -93,9 +121,16 @@ USE_TZ = True
 STATIC_URL = '/static/'
 
 STATICFILES_DIRS = [
-    BASE_DIR / "static_dev",
+    BASE_DIR / "static",
 ]
 
+STATIC_ROOT = BASE_DIR / 'static_root'
+
+if not DEBUG:
+    # collectstatic пишет файлы с хешем в имени и их копии .gz/.br.
+    STATICFILES_STORAGE = (
+        'blog.storage.CompressedManifestStaticFilesStorage')
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 CSRF_FAILURE_VIEW = 'pages.views.csrf_failure'
@@ -106,6 +141,68 @@ LOGIN_URL = 'login'
 
 MEDIA_ROOT = BASE_DIR / 'media'
 
+MEDIA_URL = '/media/'
+
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
 
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+
+BLOG_CURSOR_PAGINATION = False
+
+BLOG_PAGINATOR_COUNT_TIMEOUT = 300
+
+BLOG_PAGINATOR_ESTIMATE_THRESHOLD = 100_000
+
+BLOG_PAGE_CACHE_ALIAS = 'pages'
+
+# Кеш версий тегов: не память процесса (проверка blog.E001).
+BLOG_TAG_CACHE_ALIAS = 'tags'
+
+BLOG_PAGE_CACHE_TIMEOUT = 600
+
+# Версия выкладки (например, хеш коммита) для ETag страниц; пусто — время
+# последней правки шаблонов.
+BLOG_BUILD_VERSION = ''
+
+BLOG_CARD_CACHE_TIMEOUT = 3600
+
+BLOG_IMAGE_RENDITION_WIDTHS = (320, 640, 1280)
+
+BLOG_IMAGE_QUALITY = 82
+
+BLOG_IMAGE_WEBP_QUALITY = 80
+
+BLOG_IMAGE_JOB_MAX_ATTEMPTS = 5
+
+BLOG_IMAGE_JOB_RETRY_DELAY = 30
+
+BLOG_IMAGE_JOB_LEASE = 300
+
+# None — отдавать файлы из Django; 'x-accel-redirect' (nginx) или
+# 'x-sendfile' (Apache, lighttpd) — передать отдачу фронтенд-серверу.
+BLOG_MEDIA_ACCEL = None
+
+BLOG_MEDIA_ACCEL_PREFIX = '/protected-media/'
+
+BLOG_MEDIA_MAX_AGE = 3600
+
+# Разобрать все шаблоны проекта при старте WSGI-приложения.
+BLOG_WARM_TEMPLATES = not DEBUG
+
+# Отдавать замеры запроса в заголовке Server-Timing всем; иначе — только
+# сотрудникам.
+BLOG_SERVER_TIMING = DEBUG
+
+# Путь к классу поиска; пусто — FTS5 на SQLite, иначе icontains.
+BLOG_SEARCH_BACKEND = ''
+
+# Число строк в админке публикаций берётся из кеша (и оценки СУБД, если
+# она умеет) вместо COUNT(*) на каждый просмотр списка.
+BLOG_ADMIN_ESTIMATED_COUNT = True
+
+BLOG_ADMIN_DATE_HIERARCHY_TIMEOUT = 3600
+
+BLOG_MODERATION_CHUNK_SIZE = 1000
+
+# Число публикаций в RSS- и Atom-лентах.
+BLOG_FEED_ITEMS = 20
@@ -1,10 +1,11 @@
-from django.conf.urls.static import static
 from django.contrib import admin
 from django.conf import settings
 from django.contrib.auth.forms import UserCreationForm
 from django.urls import include, path, reverse_lazy
 from django.views.generic import CreateView
 
+from blog.media import serve_media, serve_static
+
 handler404 = 'pages.views.page_not_found'
 handler500 = 'pages.views.internal_server_error'
 
@@ -23,4 +24,20 @@ urlpatterns = [
         name='registration',
     ),
 ]
-urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+urlpatterns += [
+    path(
+        f'{settings.MEDIA_URL.lstrip("/")}<path:path>',
+        serve_media,
+        name='media',
+    ),
+]
+# За nginx или Apache (BLOG_MEDIA_ACCEL) статику отдают они сами, не
+# занимая воркеры Python.
+if settings.DEBUG or settings.BLOG_MEDIA_ACCEL is None:
+    urlpatterns += [
+        path(
+            f'{settings.STATIC_URL.lstrip("/")}<path:path>',
+            serve_static,
+            name='static',
+        ),
+    ]
@@ -0,0 +1,11 @@
+// Подгрузка следующей порции комментариев без перезагрузки страницы.
+document.addEventListener("click", function (event) {
+  var link = event.target.closest("[data-load-comments]");
+  if (!link) {
+    return;
+  }
+  event.preventDefault();
+  fetch(link.dataset.fragmentUrl)
+    .then(function (response) { return response.text(); })
+    .then(function (html) { link.outerHTML = html; });
+});
@@ -0,0 +1,57 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from mixer.backend.django import Mixer
+
+from blog.templatetags.blog_tags import card_cache_stats
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_post_cards_are_reused_across_pages(
+    user, user_client, post_with_published_location
+):
+    post = post_with_published_location
+    card_cache_stats.clear()
+
+    user_client.get("/")
+    assert card_cache_stats["misses"] == 1
+    user_client.get(f"/category/{post.category.slug}/")
+    user_client.get(f"/profile/{user.username}/")
+    assert card_cache_stats["hits"] == 2, (
+        "Убедитесь, что отрисованная карточка публикации берётся из кеша"
+        " на главной, в категории и в профиле."
+    )
+
+    post.title = "Новый заголовок карточки"
+    post.save()
+    content = user_client.get("/").content.decode("utf-8")
+    assert card_cache_stats["misses"] == 2
+    assert "Новый заголовок карточки" in content, (
+        "Убедитесь, что карточка публикации перерисовывается после её правки."
+    )
+
+
+def test_only_author_renames_refresh_cached_pages(
+    mixer: Mixer, user, unlogged_client, post_with_published_location
+):
+    category_url = f"/category/{post_with_published_location.category.slug}/"
+    unlogged_client.get("/")
+
+    mixer.blend(type(user))
+    user.set_password("new-password")
+    user.save()
+    card_cache_stats.clear()
+    with CaptureQueriesContext(connection) as ctx:
+        unlogged_client.get("/")
+    unlogged_client.get(category_url)
+    assert not ctx.captured_queries and card_cache_stats["misses"] == 0, (
+        "Регистрация и смена пароля не должны сбрасывать кеш страниц"
+        " и карточек."
+    )
+
+    user.username = "renamed-author"
+    user.save()
+    assert "@renamed-author" in unlogged_client.get("/").content.decode(), (
+        "Убедитесь, что после смены имени автора страницы перерисовываются."
+    )
@@ -0,0 +1,86 @@
+import pytest
+from django.core.management import call_command
+from mixer.backend.django import Mixer
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_comment_count_follows_comments(
+    mixer: Mixer, post_with_published_location, CommentModel
+):
+    post = post_with_published_location
+    comments = mixer.cycle(3).blend(CommentModel, post=post)
+    post.refresh_from_db()
+    assert post.comment_count == 3, (
+        "Убедитесь, что при добавлении комментария увеличивается счётчик"
+        " комментариев публикации."
+    )
+
+    comments[0].delete()
+    CommentModel.objects.filter(pk=comments[1].pk).delete()
+    post.refresh_from_db()
+    assert post.comment_count == 1, (
+        "Убедитесь, что при удалении комментария уменьшается счётчик"
+        " комментариев публикации."
+    )
+
+
+def test_recount_comments_repairs_counts(
+    mixer: Mixer, post_with_published_location, CommentModel
+):
+    post = post_with_published_location
+    mixer.cycle(2).blend(CommentModel, post=post)
+    type(post).objects.filter(pk=post.pk).update(comment_count=42)
+
+    call_command("recount_comments", batch_size=1)
+
+    post.refresh_from_db()
+    assert post.comment_count == 2, (
+        "Убедитесь, что команда `recount_comments` восстанавливает число"
+        " комментариев публикации."
+    )
+
+
+def test_comment_count_follows_moved_comments(
+    mixer: Mixer, admin_client, CommentModel
+):
+    old_post, new_post = mixer.cycle(2).blend("blog.Post")
+    comments = mixer.cycle(2).blend(CommentModel, post=old_post)
+    for comment in comments:
+        response = admin_client.post(
+            f"/admin/blog/comment/{comment.pk}/change/",
+            {
+                "text": comment.text,
+                "post": new_post.pk,
+                "author": comment.author.pk,
+            },
+        )
+        assert response.status_code == 302
+
+    old_post.refresh_from_db()
+    new_post.refresh_from_db()
+    assert (old_post.comment_count, new_post.comment_count) == (0, 2), (
+        "Убедитесь, что при переносе комментария к другой публикации"
+        " пересчитываются счётчики обеих публикаций."
+    )
+
+
+def test_loaded_comments_are_not_counted_twice(
+    mixer: Mixer, post_with_published_location, CommentModel, tmp_path
+):
+    post = post_with_published_location
+    mixer.cycle(2).blend(CommentModel, post=post)
+    dump = tmp_path / "blog.json"
+    call_command(
+        "dumpdata", "blog.Post", "blog.Comment", output=str(dump),
+        verbosity=0,
+    )
+    type(post).objects.all().delete()
+
+    call_command("loaddata", str(dump), verbosity=0)
+
+    post.refresh_from_db()
+    assert post.comment_count == 2, (
+        "Убедитесь, что `loaddata` не увеличивает счётчик комментариев,"
+        " уже сохранённый в фикстуре."
+    )
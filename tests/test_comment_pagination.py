@@ -0,0 +1,68 @@
+import pytest
+from bs4 import BeautifulSoup
+from django.db import connection
+from mixer.backend.django import Mixer
+
+from blog.paginators import CursorPaginator
+from blog.views import COMMENTS_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+N_COMMENTS = 25
+
+
+def test_comments_are_loaded_in_pages(
+    mixer: Mixer, unlogged_client, post_with_published_location, CommentModel
+):
+    post = post_with_published_location
+    comments = mixer.cycle(N_COMMENTS).blend(CommentModel, post=post)
+
+    response = unlogged_client.get(f"/posts/{post.id}/")
+    first_ids = [comment.id for comment in response.context["comments"]]
+    assert first_ids == [c.id for c in comments[:COMMENTS_PER_PAGE]], (
+        "Убедитесь, что на странице публикации выводится только первая"
+        " порция комментариев, от старых к новым."
+    )
+
+    soup = BeautifulSoup(response.content.decode("utf-8"), "html.parser")
+    load_more = soup.find("a", attrs={"data-load-comments": True})
+    assert load_more, (
+        "Убедитесь, что под первой порцией комментариев есть ссылка"
+        " для загрузки следующих."
+    )
+
+    fragment = unlogged_client.get(load_more["data-fragment-url"])
+    assert fragment.status_code == 200
+    rest_ids = [comment.id for comment in fragment.context["comments"]]
+    assert rest_ids == [c.id for c in comments[COMMENTS_PER_PAGE:]], (
+        "Убедитесь, что по ссылке «Показать ещё» загружаются оставшиеся"
+        " комментарии."
+    )
+    assert b"data-load-comments" not in fragment.content
+    assert b"<html" not in fragment.content, (
+        "Убедитесь, что следующая порция комментариев отдаётся фрагментом"
+        " без обёртки страницы."
+    )
+
+
+@pytest.mark.skipif(
+    connection.vendor != "sqlite", reason="EXPLAIN QUERY PLAN is SQLite-only"
+)
+def test_comment_pages_are_read_in_index_order(
+    mixer: Mixer, post_with_published_location, CommentModel
+):
+    post = post_with_published_location
+    mixer.cycle(N_COMMENTS).blend(CommentModel, post=post)
+    paginator = CursorPaginator(
+        post.comment.all(), COMMENTS_PER_PAGE, ordering=("created_at", "id")
+    )
+    cursor = paginator.page().next_cursor
+    forward, values = paginator.decode_cursor(cursor)
+    queryset = post.comment.filter(
+        paginator._keyset_filter(values, forward)
+    ).order_by("created_at", "id")[:COMMENTS_PER_PAGE]
+    plan = queryset.explain()
+    assert "TEMP B-TREE" not in plan, (
+        "Страница комментариев должна читаться из индекса по публикации и"
+        f" времени без сортировки всех комментариев:\n{plan}"
+    )
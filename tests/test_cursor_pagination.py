@@ -0,0 +1,60 @@
+from datetime import timedelta
+
+import pytest
+from django.test import override_settings
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+@override_settings(BLOG_CURSOR_PAGINATION=True)
+def test_cursor_pagination_walks_feed(
+    mixer: Mixer, user, unlogged_client, published_category
+):
+    now = timezone.now()
+    # Пары публикаций с одинаковым временем проверяют разбор «ничьих» по id.
+    posts = mixer.cycle(N_PER_PAGE * 2 + 3).blend(
+        "blog.Post",
+        author=user,
+        is_published=True,
+        category=published_category,
+        pub_date=mixer.sequence(lambda i: now - timedelta(hours=i // 2)),
+    )
+    expected_ids = [
+        post.id for post in sorted(
+            posts, key=lambda post: (post.pub_date, post.id), reverse=True)
+    ]
+
+    seen_ids = []
+    pages = []
+    url = "/"
+    while url:
+        response = unlogged_client.get(url)
+        assert response.status_code == 200, (
+            "Убедитесь, что страницы ленты с курсором загружаются без ошибок."
+        )
+        page = response.context["page_obj"]
+        pages.append(page)
+        seen_ids.extend(post.id for post in page)
+        url = f"/?cursor={page.next_cursor}" if page.has_next() else None
+
+    assert seen_ids == expected_ids, (
+        "Убедитесь, что при постраничном выводе по курсору публикации не"
+        " теряются и не повторяются."
+    )
+
+    response = unlogged_client.get(f"/?cursor={pages[-1].previous_cursor}")
+    assert [post.id for post in response.context["page_obj"]] == [
+        post.id for post in pages[-2]
+    ], "Убедитесь, что ссылка на предыдущую страницу ведёт назад по ленте."
+
+
+@override_settings(BLOG_CURSOR_PAGINATION=True)
+def test_cursor_pagination_rejects_broken_cursor(unlogged_client):
+    response = unlogged_client.get("/?cursor=not-a-cursor")
+    assert response.status_code == 404, (
+        "Убедитесь, что при неверном курсоре возвращается статус 404."
+    )
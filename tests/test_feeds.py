@@ -0,0 +1,89 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def posts(mixer: Mixer, user):
+    category = mixer.blend("blog.Category", is_published=True)
+    visible = mixer.cycle(3).blend(
+        "blog.Post", author=user, category=category, is_published=True,
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+    mixer.blend(
+        "blog.Post", author=user, category=category, is_published=False,
+        title="Черновик",
+    )
+    return visible
+
+
+@pytest.mark.parametrize("kind", ["rss", "atom"])
+def test_feeds_list_published_posts(posts, client, kind):
+    post = posts[0]
+    for url in (
+        f"/feed/{kind}/",
+        f"/category/{post.category.slug}/{kind}/",
+        f"/profile/{post.author.username}/{kind}/",
+    ):
+        response = client.get(url)
+        assert response.status_code == 200, url
+        content = response.content.decode()
+        assert all(p.title in content for p in posts), (
+            f"Убедитесь, что лента `{url}` содержит опубликованные посты."
+        )
+        assert "Черновик" not in content, (
+            f"Лента `{url}` не должна содержать неопубликованные посты."
+        )
+
+
+def test_feed_is_cached_and_conditional(posts, client, mixer: Mixer):
+    url = f"/category/{posts[0].category.slug}/rss/"
+    with CaptureQueriesContext(connection) as ctx:
+        first = client.get(url)
+    assert len(ctx.captured_queries) <= 3, (
+        "Лента должна строиться одним запросом с авторами и категориями."
+    )
+
+    with CaptureQueriesContext(connection) as ctx:
+        cached = client.get(url)
+        not_modified = client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+    assert not ctx.captured_queries, (
+        "Повторный запрос ленты должен обслуживаться без запросов к БД."
+    )
+    assert cached.content == first.content
+    assert not_modified.status_code == 304
+
+    posts[1].title = "Новый заголовок"
+    posts[1].save()
+    response = client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+    assert response.status_code == 200, (
+        "После правки публикации лента должна обновиться."
+    )
+    assert "Новый заголовок" in response.content.decode()
+
+
+def test_feed_cache_keeps_scheme_and_host(posts, client):
+    url = "/feed/atom/"
+    author_url = f"/profile/{posts[0].author.username}/"
+    assert f"<uri>http://testserver{author_url}</uri>" in (
+        client.get(url).content.decode()
+    ), "Ссылка на автора в Atom-ленте должна быть абсолютной."
+
+    secure = client.get(url, secure=True, HTTP_HOST="localhost")
+    content = secure.content.decode()
+    assert "http://testserver" not in content, (
+        "Лента из кеша не должна отдавать схему и домен другого запроса."
+    )
+    assert f"<uri>https://localhost{author_url}</uri>" in content
+
+
+def test_feeds_404(client, mixer: Mixer):
+    hidden = mixer.blend("blog.Category", is_published=False)
+    assert client.get(f"/category/{hidden.slug}/rss/").status_code == 404
+    assert client.get("/profile/nobody-here/atom/").status_code == 404
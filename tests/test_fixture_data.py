@@ -0,0 +1,23 @@
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_project_fixture_loads():
+    call_command("loaddata", settings.BASE_DIR / "db.json", verbosity=0)
+    assert Post.objects.count() == 39, (
+        "Убедитесь, что фикстура `db.json` загружается целиком."
+    )
+
+
+def test_project_fixture_posts_are_visible():
+    call_command("loaddata", settings.BASE_DIR / "db.json", verbosity=0)
+    assert (
+        Post.objects.published().count()
+        == Post.objects.should_be_live().count()
+        > 0
+    ), "Посты из фикстуры должны быть видны по тем же правилам публикации."
@@ -0,0 +1,231 @@
+from io import BytesIO
+
+import pytest
+from bs4 import BeautifulSoup
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from PIL import Image, ImageDraw
+
+from blog import jobs
+from blog.images import WEBP_SUPPORTED
+from blog.models import ImageJob
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+def _upload(width, height):
+    image_data = BytesIO()
+    Image.new("RGB", (width, height), "teal").save(image_data, "JPEG")
+    return SimpleUploadedFile(
+        "big.jpg", image_data.getvalue(), content_type="image/jpeg"
+    )
+
+
+def test_feed_serves_resized_renditions(
+    media_root, post_with_published_location, unlogged_client
+):
+    post = post_with_published_location
+    post.image = _upload(2000, 1000)
+    post.save()
+    call_command("process_image_jobs")
+    post.refresh_from_db()
+
+    assert post.image_renditions["width"] == 2000
+    widths = [r["width"] for r in post.image_renditions["renditions"]]
+    assert widths == [320, 640, 1280], (
+        "Убедитесь, что для загруженного изображения создаются уменьшенные"
+        " копии."
+    )
+    for rendition in post.image_renditions["renditions"]:
+        with Image.open(media_root / rendition["name"]) as resized:
+            assert resized.size == (rendition["width"], rendition["height"])
+
+    soup = BeautifulSoup(unlogged_client.get("/").content, "html.parser")
+    (img,) = soup.select("img.img-thumbnail")
+    (card_rendition,) = [
+        r for r in post.image_renditions["renditions"] if r["width"] == 640
+    ]
+    assert img["src"] == post.image.storage.url(card_rendition["name"]), (
+        "Убедитесь, что в карточке ленты выводится уменьшенная копия"
+        " изображения, а не оригинал."
+    )
+    assert "320w" in img["srcset"] and "2000w" in img["srcset"]
+    assert (img["width"], img["height"]) == ("2000", "1000")
+
+
+def test_replacing_image_removes_old_renditions(
+    media_root, post_with_published_location
+):
+    post = post_with_published_location
+    post.image = _upload(800, 600)
+    post.save()
+    call_command("process_image_jobs")
+    post.refresh_from_db()
+    old_names = [r["name"] for r in post.image_renditions["renditions"]]
+    assert old_names
+
+    post.image = _upload(500, 500)
+    post.save()
+    call_command("process_image_jobs")
+    call_command("collect_orphan_media", min_age=0)
+    post.refresh_from_db()
+
+    assert not any((media_root / name).exists() for name in old_names)
+    assert [r["width"] for r in post.image_renditions["renditions"]] == [320]
+
+
+def test_build_image_renditions_backfills_posts(
+    media_root, post_with_published_location
+):
+    post = post_with_published_location
+    post.image = _upload(700, 700)
+    post.save()
+    ImageJob.objects.all().delete()
+
+    call_command("build_image_renditions")
+    call_command("process_image_jobs")
+
+    post.refresh_from_db()
+    assert [r["width"] for r in post.image_renditions["renditions"]] == [
+        320,
+        640,
+    ], "Убедитесь, что команда создаёт копии для уже загруженных картинок."
+
+
+def test_upload_only_queues_image_job(
+    media_root, post_with_published_location, unlogged_client
+):
+    post = post_with_published_location
+    post.image = _upload(2000, 1000)
+    post.save()
+
+    assert post.image_renditions == {"source": post.image.name}, (
+        "Убедитесь, что копии изображения создаются не при сохранении"
+        " публикации, а воркером очереди."
+    )
+    job = ImageJob.objects.get(post=post)
+    assert job.status == ImageJob.PENDING
+    soup = BeautifulSoup(unlogged_client.get("/").content, "html.parser")
+    (img,) = soup.select("img.img-thumbnail")
+    assert img["src"] == post.image.url and not img.get("srcset")
+
+
+def test_failed_image_job_is_retried_then_marked_failed(
+    settings, media_root, post_with_published_location
+):
+    settings.BLOG_IMAGE_JOB_RETRY_DELAY = 0
+    settings.BLOG_IMAGE_JOB_MAX_ATTEMPTS = 2
+    post = post_with_published_location
+    post.image = _upload(700, 700)
+    post.save()
+    (media_root / post.image.name).write_bytes(b"not an image")
+
+    call_command("process_image_jobs")
+
+    job = ImageJob.objects.get(post=post)
+    assert job.status == ImageJob.FAILED, (
+        "Убедитесь, что задача повторяется и после исчерпания попыток"
+        " помечается как ошибочная."
+    )
+    assert job.attempts == 2 and job.last_error
+
+    (media_root / post.image.name).write_bytes(_upload(700, 700).read())
+    call_command("process_image_jobs", retry_failed=True)
+    assert not ImageJob.objects.exists()
+
+
+def test_jobs_removed_while_running_are_finished(
+    monkeypatch, media_root, post_with_published_location
+):
+    post = post_with_published_location
+    post.image = _upload(700, 700)
+    post.save()
+
+    def replace_image(job):
+        post.image = _upload(800, 800)
+        post.save()
+        raise OSError("картинку заменили")
+
+    monkeypatch.setattr(jobs, "run_job", replace_image)
+    assert jobs.process_next_job().last_error, (
+        "Ошибка задачи, удалённой во время работы, не должна останавливать"
+        " воркер."
+    )
+    (job,) = ImageJob.objects.all()
+    assert job.image_name == post.image.name
+    assert job.status == ImageJob.PENDING and not job.last_error
+
+    def delete_claimed(execute, sql, params, many, context):
+        result = execute(sql, params, many, context)
+        if sql.startswith('UPDATE "blog_imagejob"'):
+            execute('DELETE FROM "blog_imagejob"', (), False, context)
+        return result
+
+    with connection.execute_wrapper(delete_claimed):
+        assert jobs.claim_next_job() is None
+
+
+def _photo_like_png(width, height):
+    size = (width, height)
+    picture = Image.merge(
+        "RGB",
+        (
+            Image.linear_gradient("L").resize(size),
+            Image.radial_gradient("L").resize(size),
+            Image.linear_gradient("L").rotate(90).resize(size),
+        ),
+    )
+    draw = ImageDraw.Draw(picture)
+    for x in range(0, width, 80):
+        draw.ellipse(
+            (x, x // 2, x + 200, x // 2 + 150), outline=(255, 0, 0), width=5
+        )
+    image_data = BytesIO()
+    picture.save(image_data, "PNG")
+    return SimpleUploadedFile(
+        "photo.png", image_data.getvalue(), content_type="image/png"
+    )
+
+
+@pytest.mark.skipif(not WEBP_SUPPORTED, reason="Pillow собран без WebP")
+def test_feed_offers_smaller_webp_renditions(
+    settings, media_root, post_with_published_location, unlogged_client
+):
+    post = post_with_published_location
+    post.image = _photo_like_png(1600, 1200)
+    post.save()
+    call_command("process_image_jobs")
+
+    soup = BeautifulSoup(unlogged_client.get("/").content, "html.parser")
+    (picture,) = soup.select("picture")
+    assert len(picture.find_all("img")) == 1
+    source = picture.find("source", type="image/webp")
+    assert source is not None, (
+        "Убедитесь, что карточка предлагает браузеру копии в WebP через"
+        " `<picture>`."
+    )
+    urls = dict(
+        reversed(candidate.split())
+        for candidate in source["srcset"].split(", ")
+    )
+    assert set(urls) == {"320w", "640w", "1280w", "1600w"}
+
+    def file_size(url):
+        name = url.removeprefix(settings.MEDIA_URL)
+        return (media_root / name).stat().st_size
+
+    card_webp = file_size(urls["640w"])
+    card_fallback = file_size(picture.img["src"])
+    original = file_size(post.image.url)
+    assert card_webp < card_fallback < original, (
+        "Убедитесь, что копия в WebP для карточки меньше JPEG-копии, а та —"
+        f" оригинала: {card_webp}, {card_fallback}, {original} байт."
+    )
+    assert card_webp * 5 < original
@@ -0,0 +1,78 @@
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+HASHED_NAME = "posts_images/ab/" + "ab" * 32 + ".jpg"
+CONTENT = bytes(range(256)) * 4
+
+
+@pytest.fixture
+def media_file(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    path = tmp_path / HASHED_NAME
+    path.parent.mkdir(parents=True)
+    path.write_bytes(CONTENT)
+    return f"/media/{HASHED_NAME}"
+
+
+def test_media_file_is_served_with_cache_headers(client, media_file):
+    response = client.get(media_file)
+    assert response.status_code == 200
+    assert b"".join(response.streaming_content) == CONTENT
+    assert response["Accept-Ranges"] == "bytes"
+    assert "immutable" in response["Cache-Control"], (
+        "Файлы с адресом по хешу содержимого должны кешироваться навсегда."
+    )
+
+    response = client.get(media_file, HTTP_IF_NONE_MATCH=response["ETag"])
+    assert response.status_code == 304
+    response = client.get(
+        media_file, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+    )
+    assert response.status_code == 304
+
+
+@pytest.mark.parametrize(
+    ("header", "expected"),
+    [
+        ("bytes=10-19", CONTENT[10:20]),
+        ("bytes=1000-", CONTENT[1000:]),
+        ("bytes=-5", CONTENT[-5:]),
+    ],
+)
+def test_media_range_requests(client, media_file, header, expected):
+    response = client.get(media_file, HTTP_RANGE=header)
+    assert response.status_code == 206, (
+        "Убедитесь, что медиафайлы отдаются частями по заголовку Range."
+    )
+    assert b"".join(response.streaming_content) == expected
+    assert int(response["Content-Length"]) == len(expected)
+    assert response["Content-Range"].endswith(f"/{len(CONTENT)}")
+
+
+def test_unsatisfiable_range_and_unsafe_paths(client, media_file):
+    response = client.get(media_file, HTTP_RANGE="bytes=5000-")
+    assert response.status_code == 416
+    assert client.get("/media/../settings.py").status_code == 404
+    assert client.get("/media/posts_images/missing.jpg").status_code == 404
+
+
+@pytest.mark.parametrize(
+    ("mode", "header", "value"),
+    [
+        ("x-accel-redirect", "X-Accel-Redirect",
+         f"/protected-media/{HASHED_NAME}"),
+        ("x-sendfile", "X-Sendfile", None),
+    ],
+)
+def test_media_transfer_is_offloaded(
+    settings, client, media_file, mode, header, value
+):
+    settings.BLOG_MEDIA_ACCEL = mode
+    response = client.get(media_file)
+    assert response.status_code == 200
+    assert response.content == b"", (
+        "При отдаче через фронтенд-сервер Django не должен читать файл."
+    )
+    expected = value or str(settings.MEDIA_ROOT / HASHED_NAME)
+    assert response[header] == expected
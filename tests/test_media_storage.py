@@ -0,0 +1,160 @@
+import os
+from io import BytesIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from mixer.backend.django import Mixer
+from PIL import Image
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+def _upload(name, color):
+    image_data = BytesIO()
+    Image.new("RGB", (400, 300), color).save(image_data, "JPEG")
+    return SimpleUploadedFile(
+        name, image_data.getvalue(), content_type="image/jpeg"
+    )
+
+
+def _stored_files(media_root):
+    return sorted(
+        str(path.relative_to(media_root))
+        for path in media_root.rglob("*")
+        if path.is_file()
+    )
+
+
+def _post_with_image(mixer, user, category, upload):
+    post = mixer.blend(
+        "blog.Post", author=user, category=category, image=None
+    )
+    post.image = upload
+    post.save()
+    return post
+
+
+def test_identical_uploads_are_stored_once(
+    media_root, mixer: Mixer, user, published_category
+):
+    first = _post_with_image(
+        mixer, user, published_category, _upload("cat.jpg", "red")
+    )
+    second = _post_with_image(
+        mixer, user, published_category, _upload("other name.JPG", "red")
+    )
+
+    assert first.image.name == second.image.name, (
+        "Убедитесь, что одинаковые изображения сохраняются в хранилище"
+        " один раз."
+    )
+    assert "cat" not in first.image.name
+    assert _stored_files(media_root) == [first.image.name]
+
+
+def test_image_is_collected_after_its_last_post(
+    media_root, mixer: Mixer, user, published_category
+):
+    first = _post_with_image(
+        mixer, user, published_category, _upload("a.jpg", "red")
+    )
+    second = _post_with_image(
+        mixer, user, published_category, _upload("b.jpg", "red")
+    )
+    call_command("process_image_jobs")
+    first.refresh_from_db()
+    second.refresh_from_db()
+    stored = _stored_files(media_root)
+    assert len(stored) > 1
+
+    first.delete()
+    call_command("collect_orphan_media", min_age=0)
+    assert _stored_files(media_root) == stored, (
+        "Изображение, которое есть у другой публикации, удалять нельзя."
+    )
+
+    second.delete()
+    assert _stored_files(media_root) == stored, (
+        "Файлы удаляет только `collect_orphan_media`: их может в этот момент"
+        " загружать другая публикация."
+    )
+    call_command("collect_orphan_media", min_age=0)
+    assert _stored_files(media_root) == [], (
+        "Убедитесь, что изображение и его копии удаляются вместе с последней"
+        " публикацией, которая на них ссылается."
+    )
+
+
+def test_replaced_image_is_released(
+    media_root, mixer: Mixer, user, published_category
+):
+    post = _post_with_image(
+        mixer, user, published_category, _upload("a.jpg", "red")
+    )
+    post.image = _upload("b.jpg", "blue")
+    post.save()
+    call_command("collect_orphan_media", min_age=0)
+
+    assert _stored_files(media_root) == [post.image.name]
+
+
+def test_reused_image_is_not_collected(
+    media_root, mixer: Mixer, user, published_category
+):
+    post = _post_with_image(
+        mixer, user, published_category, _upload("a.jpg", "red")
+    )
+    path = media_root / post.image.name
+    os.utime(path, (0, 0))
+    post.delete()
+
+    # Та же картинка загружается снова, а публикация ещё не сохранена.
+    name = Post._meta.get_field("image").storage.save(
+        "posts_images/c.jpg", _upload("c.jpg", "red")
+    )
+    call_command("collect_orphan_media", min_age=3600)
+    assert (media_root / name).exists(), (
+        "Повторная загрузка файла должна защищать его от удаления"
+        " командой `collect_orphan_media`."
+    )
+
+
+@pytest.mark.skipif(
+    connection.vendor != "sqlite", reason="EXPLAIN QUERY PLAN is SQLite-only"
+)
+def test_image_lookup_uses_index():
+    plan = Post.objects.filter(image="posts_images/x.jpg").explain()
+    assert "USING" in plan and "INDEX" in plan, (
+        f"Поиск публикаций по файлу изображения должен идти по индексу:"
+        f"\n{plan}"
+    )
+
+
+def test_collect_orphan_media_keeps_referenced_files(
+    media_root, mixer: Mixer, user, published_category
+):
+    post = _post_with_image(
+        mixer, user, published_category, _upload("a.jpg", "red")
+    )
+    call_command("process_image_jobs")
+    post.refresh_from_db()
+    referenced = _stored_files(media_root)
+    orphan = media_root / "posts_images" / "ab" / "orphan.jpg"
+    orphan.parent.mkdir(parents=True, exist_ok=True)
+    orphan.write_bytes(b"orphan")
+
+    call_command("collect_orphan_media", min_age=3600)
+    assert orphan.exists(), "Свежие файлы команда удалять не должна."
+
+    call_command("collect_orphan_media", min_age=0)
+    assert _stored_files(media_root) == referenced
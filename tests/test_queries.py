@@ -0,0 +1,320 @@
+import re
+from datetime import timedelta
+
+import pytest
+from django.core.cache.backends.filebased import FileBasedCache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from blog.cache import get_tag_versions, invalidate_tags
+from blog.checks import check_tag_cache
+from blog.models import Post
+from blog.paginators import CachedCountPaginator
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+N_SEED_POSTS = 5000
+N_SEED_AUTHORS = 50
+N_SEED_CATEGORIES = 20
+FULL_SCAN_RE = re.compile(r"SCAN (TABLE )?blog_post(?! USING)")
+
+
+def _count_queries(client, url: str) -> int:
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url)
+    assert response.status_code == 200, (
+        f"Убедитесь, что страница `{url}` загружается без ошибок."
+    )
+    return len(ctx.captured_queries)
+
+
+def _blend_posts(mixer: Mixer, n: int, author, category, locations):
+    mixer.cycle(n).blend(
+        "blog.Post",
+        author=author,
+        is_published=True,
+        category=category,
+        location=mixer.sequence(*locations),
+    )
+
+
+@pytest.mark.parametrize(
+    ("url_template", "budget"),
+    [
+        ("/", 2),
+        ("/category/{category.slug}/", 4),
+        ("/profile/{user.username}/", 3),
+    ],
+    ids=["index", "category", "profile"],
+)
+def test_post_list_query_budget(
+    mixer: Mixer, user, unlogged_client, published_category,
+    published_locations, url_template, budget
+):
+    url = url_template.format(category=published_category, user=user)
+
+    _blend_posts(mixer, 1, user, published_category, published_locations)
+    queries_for_one_post = _count_queries(unlogged_client, url)
+
+    _blend_posts(
+        mixer, N_PER_PAGE * 2, user, published_category, published_locations
+    )
+    queries_for_full_page = _count_queries(unlogged_client, url)
+
+    assert queries_for_full_page == queries_for_one_post, (
+        f"Убедитесь, что число запросов к БД на странице `{url}` не зависит"
+        " от количества публикаций на ней: автор, категория и местоположение"
+        " должны загружаться вместе с публикациями."
+    )
+    assert queries_for_full_page <= budget, (
+        f"Страница `{url}` выполняет {queries_for_full_page} запросов к БД,"
+        f" ожидалось не более {budget}."
+    )
+
+
+@pytest.fixture
+def seeded_posts(mixer: Mixer):
+    categories = mixer.cycle(N_SEED_CATEGORIES).blend(
+        "blog.Category", is_published=True
+    )
+    authors = mixer.cycle(N_SEED_AUTHORS).blend("auth.User")
+    now = timezone.now()
+    Post.objects.bulk_create(
+        Post(
+            title="title",
+            text="text",
+            author=authors[i % N_SEED_AUTHORS],
+            category=categories[i % N_SEED_CATEGORIES],
+            is_published=bool(i % 10),
+            pub_date=now - timedelta(minutes=i - 100),
+        )
+        for i in range(N_SEED_POSTS)
+    )
+    Post.objects.refresh_live()
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+    return categories[1], authors[1]
+
+
+def _explain_count(queryset):
+    """План того же COUNT(*), что выполняет пагинатор."""
+    with CaptureQueriesContext(connection) as ctx:
+        queryset.count()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN QUERY PLAN {ctx.captured_queries[-1]['sql']}")
+        return "\n".join(str(row[-1]) for row in cursor.fetchall())
+
+
+@pytest.mark.skipif(
+    connection.vendor != "sqlite", reason="EXPLAIN QUERY PLAN is SQLite-only"
+)
+def test_post_list_queries_use_indexes(seeded_posts):
+    category, author = seeded_posts
+    querysets = {
+        "index": Post.objects.published(),
+        "category": category.posts.published(),
+        "profile": Post.objects.filter(author__username=author.username),
+    }
+    for name, qs in querysets.items():
+        page_qs = (
+            qs.with_card_data().order_by("-pub_date", "-id")[:N_PER_PAGE]
+        )
+        page_plan = page_qs.explain()
+        count_plan = _explain_count(qs)
+        plans = [page_plan]
+        if name == "index":
+            # Видимых публикаций ~90% таблицы, и после ANALYZE SQLite
+            # законно считает их проходом по таблице. Проверяем, что COUNT
+            # читает одну таблицу по флагу is_live — без соединения с
+            # категориями и без сортировки, как было до его появления.
+            assert count_plan.strip() in (
+                "SCAN blog_post",
+                "SCAN blog_post USING INDEX post_live_feed_idx",
+                "SCAN blog_post USING COVERING INDEX post_live_feed_idx",
+            ), (
+                "Число публикаций ленты должно считаться по одной таблице:"
+                f"\n{count_plan}"
+            )
+        else:
+            plans.append(count_plan)
+        for plan in plans:
+            assert not FULL_SCAN_RE.search(plan), (
+                f"Запрос страницы `{name}` читает таблицу публикаций целиком:"
+                f"\n{plan}"
+            )
+        assert "TEMP B-TREE" not in page_plan, (
+            f"Публикации страницы `{name}` должны читаться из индекса уже"
+            f" упорядоченными, без сортировки и группировки:\n{page_plan}"
+        )
+
+
+@pytest.mark.skipif(
+    connection.vendor != "sqlite", reason="EXPLAIN QUERY PLAN is SQLite-only"
+)
+def test_foreign_key_lookups_use_indexes(seeded_posts):
+    category, author = seeded_posts
+    with connection.cursor() as cursor:
+        # Так Django обнуляет категорию постов при её удалении (SET_NULL).
+        cursor.execute(
+            "EXPLAIN QUERY PLAN UPDATE blog_post SET category_id = NULL"
+            " WHERE category_id IN (%s)",
+            [category.pk],
+        )
+        plans = ["\n".join(str(row[-1]) for row in cursor.fetchall())]
+    plans.append(Post.objects.filter(category=category).explain())
+    plans.append(Post.objects.filter(author=author).explain())
+    for plan in plans:
+        assert not FULL_SCAN_RE.search(plan), (
+            f"Поиск публикаций по категории или автору без фильтра"
+            f" видимости читает таблицу целиком:\n{plan}"
+        )
+
+
+def test_feed_count_is_cached_until_posts_change(
+    mixer: Mixer, user, user_client, published_category,
+    published_locations
+):
+    _blend_posts(mixer, 3, user, published_category, published_locations)
+    queries_cold = _count_queries(user_client, "/")
+    hits_before = CachedCountPaginator.stats["hits"]
+    queries_warm = _count_queries(user_client, "/")
+    assert queries_warm == queries_cold - 1, (
+        "Убедитесь, что общее число публикаций для пагинации берётся из кеша"
+        " при повторном запросе страницы."
+    )
+    assert CachedCountPaginator.stats["hits"] == hits_before + 1
+
+    _blend_posts(
+        mixer, N_PER_PAGE, user, published_category, published_locations
+    )
+    response = user_client.get("/")
+    assert response.context["paginator"].count == N_PER_PAGE + 3, (
+        "Убедитесь, что кеш числа публикаций сбрасывается при их изменении."
+    )
+
+
+@pytest.mark.parametrize(
+    ("client_fixture", "budget"),
+    [("unlogged_client", 2), ("user_client", 4)],
+    ids=["anonymous", "author"],
+)
+def test_post_detail_query_budget(
+    request, mixer: Mixer, post_with_published_location, CommentModel,
+    client_fixture, budget
+):
+    client = request.getfixturevalue(client_fixture)
+    url = f"/posts/{post_with_published_location.id}/"
+    mixer.cycle(5).blend(CommentModel, post=post_with_published_location)
+
+    queries = _count_queries(client, url)
+
+    assert queries <= budget, (
+        f"Страница публикации выполняет {queries} запросов к БД, ожидалось"
+        f" не более {budget}: публикация со связанными объектами и"
+        " комментарии с авторами должны читаться двумя запросами."
+    )
+
+
+def test_anonymous_pages_are_cached_until_content_changes(
+    mixer: Mixer, user, unlogged_client, post_with_published_location,
+    CommentModel
+):
+    post = post_with_published_location
+    urls = [
+        "/",
+        f"/category/{post.category.slug}/",
+        f"/profile/{user.username}/",
+        f"/posts/{post.id}/",
+    ]
+    for url in urls:
+        _count_queries(unlogged_client, url)
+        assert _count_queries(unlogged_client, url) == 0, (
+            f"Убедитесь, что страница `{url}` для анонимного читателя"
+            " отдаётся из кеша без запросов к БД."
+        )
+
+    mixer.blend(CommentModel, post=post, text="свежий комментарий")
+    for url in urls:
+        assert _count_queries(unlogged_client, url) > 0, (
+            f"Убедитесь, что кеш страницы `{url}` сбрасывается при"
+            " добавлении комментария к публикации на ней."
+        )
+    assert "(1)" in unlogged_client.get("/").content.decode("utf-8")
+
+
+def test_unchanged_pages_answer_not_modified(
+    mixer: Mixer, user, user_client, post_with_published_location,
+    CommentModel
+):
+    post = post_with_published_location
+    urls = [
+        "/",
+        f"/category/{post.category.slug}/",
+        f"/profile/{user.username}/",
+        f"/posts/{post.id}/",
+    ]
+    etags = {}
+    for url in urls:
+        response = user_client.get(url)
+        assert response.has_header("ETag") and response.has_header(
+            "Last-Modified"
+        ), f"Убедитесь, что страница `{url}` отдаёт ETag и Last-Modified."
+        etags[url] = response["ETag"]
+        with CaptureQueriesContext(connection) as ctx:
+            response = user_client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+        assert response.status_code == 304, (
+            f"Убедитесь, что неизменившаяся страница `{url}` отвечает 304."
+        )
+        assert not any(
+            "blog_" in query["sql"] for query in ctx.captured_queries
+        ), f"Ответ 304 для `{url}` не должен читать публикации из БД."
+
+    mixer.blend(CommentModel, post=post)
+    for url in urls:
+        response = user_client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+        assert response.status_code == 200, (
+            f"Убедитесь, что после нового комментария страница `{url}`"
+            " отдаётся заново."
+        )
+
+
+def test_not_modified_is_not_reused_after_login_again(
+    user, user_client, post_with_published_location
+):
+    url = f"/posts/{post_with_published_location.id}/"
+    response = user_client.get(url)
+    assert "no-cache" in response["Cache-Control"], (
+        "Браузер должен проверять страницу у сервера перед показом копии."
+    )
+    assert "private" in response["Cache-Control"]
+    etag = response["ETag"]
+
+    user_client.logout()
+    user_client.force_login(user)
+    response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200, (
+        "После повторного входа страница с формой должна отдаваться заново:"
+        " в старой копии устаревший CSRF-токен."
+    )
+
+
+def test_tag_versions_are_shared_between_workers(settings):
+    tag_cache = settings.CACHES[settings.BLOG_TAG_CACHE_ALIAS]
+    # Отдельный экземпляр бэкенда — как кеш в другом воркере.
+    other_worker = FileBasedCache(tag_cache["LOCATION"], {})
+    invalidate_tags("feed")
+    (version,) = get_tag_versions("feed")
+    assert other_worker.get("blog:tag:feed") == version, (
+        "Версии тегов кеша должны быть видны всем процессам приложения."
+    )
+
+    settings.CACHES = {
+        **settings.CACHES,
+        settings.BLOG_TAG_CACHE_ALIAS: {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        },
+    }
+    assert [e.id for e in check_tag_cache(None)] == ["blog.E001"]
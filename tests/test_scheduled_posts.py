@@ -0,0 +1,93 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from blog.scheduler import publish_due_posts
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_scheduled_post_goes_live_on_schedule(
+    mixer: Mixer, user, unlogged_client, published_category
+):
+    post = mixer.blend(
+        "blog.Post",
+        author=user,
+        is_published=True,
+        category=published_category,
+        pub_date=timezone.now() + timedelta(hours=1),
+    )
+    assert not post.is_live
+    assert post.title not in unlogged_client.get("/").content.decode()
+
+    type(post).objects.filter(pk=post.pk).update(
+        pub_date=timezone.now() - timedelta(seconds=1)
+    )
+    assert post.title not in unlogged_client.get("/").content.decode(), (
+        "Отложенный пост должен появляться в ленте только после запуска"
+        " планировщика."
+    )
+
+    call_command("publish_scheduled")
+
+    post.refresh_from_db()
+    assert post.is_live
+    assert post.title in unlogged_client.get("/").content.decode(), (
+        "Убедитесь, что команда `publish_scheduled` включает наступившие"
+        " отложенные публикации и сбрасывает кеш ленты."
+    )
+
+
+def test_unpublishing_category_hides_its_posts(
+    mixer: Mixer, user, published_category
+):
+    post = mixer.blend(
+        "blog.Post", author=user, is_published=True,
+        category=published_category, pub_date=timezone.now(),
+    )
+    assert post.is_live
+
+    published_category.is_published = False
+    published_category.save()
+
+    post.refresh_from_db()
+    assert not post.is_live, (
+        "Убедитесь, что при снятии категории с публикации её посты"
+        " пропадают из ленты."
+    )
+
+
+def test_post_unpublished_during_publishing_stays_hidden(
+    mixer: Mixer, user, published_category
+):
+    post = mixer.blend(
+        "blog.Post",
+        author=user,
+        is_published=True,
+        category=published_category,
+        pub_date=timezone.now() + timedelta(hours=1),
+    )
+    type(post).objects.filter(pk=post.pk).update(
+        pub_date=timezone.now() - timedelta(seconds=1)
+    )
+
+    def unpublish_before_update(execute, sql, params, many, context):
+        if sql.startswith('UPDATE "blog_post"'):
+            execute(
+                'UPDATE "blog_post" SET "is_published" = %s WHERE "id" = %s',
+                (False, post.pk), False, context,
+            )
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(unpublish_before_update):
+        assert publish_due_posts() == 0
+
+    post.refresh_from_db()
+    assert not post.is_live, (
+        "Пост, снятый с публикации во время работы планировщика, не должен"
+        " становиться видимым."
+    )
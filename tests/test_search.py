@@ -0,0 +1,93 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from blog.search import get_search_backend
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def visible(mixer: Mixer):
+    category = mixer.blend("blog.Category", is_published=True)
+
+    def blend(**kwargs):
+        kwargs.setdefault("pub_date", timezone.now() - timedelta(days=1))
+        return mixer.blend(
+            "blog.Post", is_published=True, category=category, **kwargs
+        )
+
+    return blend
+
+
+def _search(client, query, cursor=None):
+    params = {"q": query}
+    if cursor:
+        params["cursor"] = cursor
+    response = client.get("/search/", params)
+    assert response.status_code == 200
+    return response.context["page_obj"]
+
+
+def test_search_ranks_title_matches_first(visible, mixer: Mixer, client):
+    in_text = visible(title="Заметки", text="Поездка на Байкал зимой")
+    in_title = visible(title="Байкал", text="Поездка зимой")
+    visible(title="Рецепт борща", text="Свёкла")
+    mixer.blend("blog.Post", title="Байкал", is_published=False)
+    visible(title="Байкал", pub_date=timezone.now() + timedelta(days=1))
+
+    page = _search(client, "байк")
+
+    assert list(page) == [in_title, in_text], (
+        "Убедитесь, что поиск находит только видимые публикации и выше"
+        " ставит совпадения в заголовке."
+    )
+
+
+def test_search_cursor_pagination(visible, client):
+    posts = [visible(title=f"Байкал {i}") for i in range(15)]
+
+    first = _search(client, "байкал")
+    with CaptureQueriesContext(connection) as ctx:
+        second = _search(client, "байкал", first.next_cursor)
+
+    assert len(first) == 10 and first.has_next()
+    assert len(second) == 5 and not second.has_next()
+    assert sorted(p.pk for p in [*first, *second]) == [p.pk for p in posts]
+    assert not any(
+        "COUNT(" in q["sql"] or "OFFSET" in q["sql"]
+        for q in ctx.captured_queries
+    ), "Страницы поиска должны выбираться курсором, без COUNT и OFFSET."
+    assert client.get("/search/?q=x&cursor=bad").status_code == 404
+
+
+def test_search_index_follows_edits(visible, client):
+    post = visible(title="Байкал")
+    post.title = "Алтай"
+    post.save()
+    assert list(_search(client, "алтай")) == [post]
+    assert list(_search(client, "байкал")) == []
+
+    post.delete()
+    assert list(_search(client, "алтай")) == []
+    assert list(_search(client, "")) == []
+
+
+def test_search_query_uses_index(visible):
+    visible(title="Байкал")
+    backend = get_search_backend()
+    if connection.vendor != "sqlite":
+        pytest.skip("План запроса проверяется только для FTS5.")
+    with CaptureQueriesContext(connection) as ctx:
+        backend.ranked("байкал", 11)
+    sql = ctx.captured_queries[-1]["sql"]
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+        plan = " ".join(str(row[-1]) for row in cursor.fetchall())
+    assert "VIRTUAL TABLE" in plan and "SCAN blog_post " not in plan, (
+        f"Поиск должен идти по индексу FTS5, а не по таблице: {plan}"
+    )
@@ -0,0 +1,102 @@
+import gzip
+import importlib
+import json
+
+import pytest
+from bs4 import BeautifulSoup
+from django.core.management import call_command
+from django.urls import clear_url_caches
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def collected_static(settings, tmp_path):
+    settings.STATIC_ROOT = tmp_path
+    settings.STATICFILES_STORAGE = (
+        "blog.storage.CompressedManifestStaticFilesStorage"
+    )
+    call_command("collectstatic", interactive=False, verbosity=0)
+    manifest = json.loads((tmp_path / "staticfiles.json").read_text())
+    return tmp_path, manifest["paths"]
+
+
+def _stylesheets(client):
+    soup = BeautifulSoup(client.get("/").content, "html.parser")
+    return [link["href"] for link in soup.find_all("link", rel="stylesheet")]
+
+
+def test_bootstrap_is_included_once_from_local_static(client):
+    assert _stylesheets(client) == ["/static/css/bootstrap.min.css"], (
+        "Убедитесь, что стили Bootstrap подключаются один раз и из статики"
+        " проекта, а не с CDN."
+    )
+
+
+def test_collected_static_is_hashed_and_precompressed(
+    client, collected_static
+):
+    static_root, paths = collected_static
+    hashed_css = paths["css/bootstrap.min.css"]
+    assert hashed_css != "css/bootstrap.min.css"
+    assert _stylesheets(client) == [f"/static/{hashed_css}"], (
+        "Убедитесь, что страницы ссылаются на статику с хешем в имени."
+    )
+
+    original = (static_root / hashed_css).read_bytes()
+    compressed = (static_root / f"{hashed_css}.gz").read_bytes()
+    assert gzip.decompress(compressed) == original
+    assert len(compressed) * 4 < len(original)
+
+    response = client.get(
+        f"/static/{hashed_css}", HTTP_ACCEPT_ENCODING="gzip, deflate"
+    )
+    assert response.status_code == 200
+    assert response["Content-Encoding"] == "gzip"
+    assert response["Content-Type"].startswith("text/css")
+    assert "immutable" in response["Cache-Control"]
+    assert "Accept-Encoding" in response["Vary"]
+    body = b"".join(response.streaming_content)
+    assert body == compressed, (
+        f"Стили должны передаваться сжатыми: {len(body)} байт вместо"
+        f" {len(original)}."
+    )
+
+    response = client.get(f"/static/{hashed_css}")
+    assert "Content-Encoding" not in response
+    assert b"".join(response.streaming_content) == original
+
+    for header in ("gzip;q=0", "br;q=0, gzip;q=0", "identity", "*;q=0"):
+        response = client.get(
+            f"/static/{hashed_css}", HTTP_ACCEPT_ENCODING=header
+        )
+        assert "Content-Encoding" not in response, (
+            f"Клиенту с `Accept-Encoding: {header}` нельзя отдавать сжатый"
+            " файл."
+        )
+    response = client.get(
+        f"/static/{hashed_css}", HTTP_ACCEPT_ENCODING="br;q=0, *;q=0.5"
+    )
+    assert response["Content-Encoding"] == "gzip"
+
+
+def _url_names(urlconf):
+    clear_url_caches()
+    return {
+        getattr(pattern, "name", None)
+        for pattern in importlib.reload(urlconf).urlpatterns
+    }
+
+
+def test_static_is_left_to_front_end_server(settings):
+    urlconf = importlib.import_module(settings.ROOT_URLCONF)
+    settings.DEBUG = False
+    settings.BLOG_MEDIA_ACCEL = "x-accel-redirect"
+    try:
+        assert "static" not in _url_names(urlconf), (
+            "За фронтенд-сервером статика не должна отдаваться через Django."
+        )
+        settings.BLOG_MEDIA_ACCEL = None
+        assert "static" in _url_names(urlconf)
+    finally:
+        clear_url_caches()
@@ -0,0 +1,36 @@
+import copy
+
+import pytest
+from django.core.management import call_command
+from django.template import engines
+from django.template.loaders.cached import Loader as CachedLoader
+
+
+@pytest.fixture
+def cached_templates(settings):
+    templates = copy.deepcopy(settings.TEMPLATES)
+    templates[0]["OPTIONS"]["loaders"] = [
+        ("django.template.loaders.cached.Loader", settings.TEMPLATE_LOADERS)
+    ]
+    settings.TEMPLATES = templates
+    (loader,) = engines["django"].engine.template_loaders
+    assert isinstance(loader, CachedLoader)
+    return loader
+
+
+def test_warm_templates_fills_template_cache(cached_templates, capsys):
+    assert not cached_templates.get_template_cache
+
+    call_command("warm_templates")
+
+    cached = set(cached_templates.get_template_cache)
+    assert {
+        "base.html",
+        "includes/post_card.html",
+        "includes/paginator.html",
+        "blog/index.html",
+    } <= cached, (
+        "Убедитесь, что команда `warm_templates` заранее разбирает шаблоны"
+        " проекта."
+    )
+    assert "Разобрано шаблонов" in capsys.readouterr().out
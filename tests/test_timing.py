@@ -0,0 +1,48 @@
+import re
+
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+SERVER_TIMING_RE = re.compile(
+    r'^db;desc="(\d+) SQL";dur=[\d.]+, tpl;dur=[\d.]+, total;dur=[\d.]+$'
+)
+
+
+def test_responses_carry_server_timing(
+    user_client, post_with_published_location
+):
+    response = user_client.get("/")
+    match = SERVER_TIMING_RE.match(response.get("Server-Timing", ""))
+    assert match, (
+        "Убедитесь, что ответы содержат заголовок `Server-Timing` с числом"
+        " SQL-запросов, временем БД, шаблона и общим временем."
+    )
+    assert int(match.group(1)) > 0
+
+
+def test_stats_endpoint_is_staff_only(client, user_client, admin_client):
+    assert client.get("/stats/").status_code == 302
+    assert user_client.get("/stats/").status_code == 403
+
+    admin_client.get("/")
+    admin_client.get("/")
+    stats = admin_client.get("/stats/").json()
+
+    index = stats["views"]["blog:index"]
+    assert index["requests"] >= 2, (
+        "Убедитесь, что замеры копятся по имени URL."
+    )
+    assert sum(index["histogram"].values()) == index["requests"]
+    assert index["avg_queries"] > 0
+    assert {"hits", "misses", "hit_rate"} <= set(stats["card_cache"])
+
+
+def test_server_timing_is_staff_only_in_production(
+    settings, client, admin_client
+):
+    settings.BLOG_SERVER_TIMING = False
+    assert not client.get("/").has_header("Server-Timing"), (
+        "Без BLOG_SERVER_TIMING замеры запроса не должны видеть все."
+    )
+    assert admin_client.get("/").has_header("Server-Timing")